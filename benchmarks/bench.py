@@ -0,0 +1,146 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from world import ENGINES, World  # noqa: E402
+from world_helper import natural_solver  # noqa: E402
+
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+THRESHOLD = 0.25
+# canonical seeded worlds, from the README example up to the largest grids
+SCENARIOS: Dict[str, Dict] = {
+    "readme": dict(
+        size=(10, 10), initial_individuals=20, initial_populations=3, initial_assets=50
+    ),
+    "small": dict(
+        size=(100, 100),
+        initial_individuals=1_000,
+        initial_populations=10,
+        initial_assets=10_000,
+    ),
+    "medium": dict(
+        size=(500, 500),
+        initial_individuals=10_000,
+        initial_populations=20,
+        initial_assets=250_000,
+    ),
+    "large": dict(
+        size=(2000, 2000),
+        initial_individuals=100_000,
+        initial_populations=50,
+        initial_assets=1_000_000,
+    ),
+}
+TICKS = {"readme": 200, "small": 50, "medium": 10, "large": 3}
+
+
+def run_scenario(scenario: str, engine: str, ticks: int, seed: int) -> Dict:
+    world = World(engine=engine, seed=seed, **SCENARIOS[scenario])
+    profiler = world.enable_profiling()
+    solver = 0.0
+    done = 0
+    start = time.perf_counter()
+    while done < ticks and len(world.population):
+        conflicts = world.get_conflicts()
+        step = time.perf_counter()
+        solutions = natural_solver(conflicts, world.rng)
+        solver += time.perf_counter() - step
+        world.solve_conflicts(solutions)
+        world.move_time()
+        done += 1
+    elapsed = time.perf_counter() - start
+    world.close()
+    phases = {name: stats.mean for name, stats in profiler.stats().items()}
+    phases["natural_solver"] = solver / max(done, 1)
+    return {
+        "ticks": done,
+        "seconds": elapsed,
+        "ticks_per_second": done / elapsed if elapsed else 0.0,
+        "population": len(world.population),
+        "phases": phases,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        if baseline[key]["ticks"] != result["ticks"]:
+            print(f"{key:24} skipped, the baseline ran {baseline[key]['ticks']} ticks")
+            continue
+        expected = baseline[key]["ticks_per_second"]
+        ratio = result["ticks_per_second"] / expected
+        print(f"{key:24} {ratio:6.2f}x baseline ({expected:.2f} ticks/s)")
+        if ratio < 1 - threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="World throughput benchmarks")
+    parser.add_argument(
+        "--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS)
+    )
+    parser.add_argument(
+        "--engines", nargs="+", default=["object", "vectorized"], choices=ENGINES
+    )
+    parser.add_argument(
+        "--ticks", type=int, help="ticks per scenario, defaults to the scale"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store these results as the new baseline instead of comparing",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for scenario in args.scenarios:
+        for engine in args.engines:
+            key = f"{scenario}/{engine}"
+            ticks = TICKS[scenario] if args.ticks is None else args.ticks
+            results[key] = run_scenario(scenario, engine, ticks, args.seed)
+            result = results[key]
+            phases = ", ".join(
+                f"{name} {1000 * seconds:.1f}ms"
+                for name, seconds in result["phases"].items()
+            )
+            print(f"{key:24} {result['ticks_per_second']:8.2f} ticks/s  {phases}")
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.update_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2))
+        return
+    if not Path(args.baseline).exists():
+        return
+    baseline = json.loads(Path(args.baseline).read_text())["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"throughput regressed by more than {args.threshold:.0%}: {regressions}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ ASSET_TYPES = [
     AssetType.NON_GROWABLE,
 ]
 ASSET_NUM = len(ASSET_TYPES)
+GROWABLE_TYPES = [AssetType.EDIBLE, AssetType.GROWABLE]
+ASSET_INDEX = {asset_type: i for i, asset_type in enumerate(ASSET_TYPES)}
 
 
 class Asset:
@@ -48,7 +50,7 @@ class Asset:
 
     @property
     def is_growable(self) -> bool:
-        return self.asset_type in (AssetType.EDIBLE, AssetType.GROWABLE)
+        return self.asset_type in GROWABLE_TYPES
 
     def __str__(self) -> str:
         return f"<Asset: {self.asset_type.name}>"
@@ -56,5 +58,10 @@ class Asset:
     def __repr__(self) -> str:
         return f"<Asset: {self.asset_type.name}>"
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Asset):
+            return NotImplemented
+        return self.asset_type == other.asset_type
+
     def __hash__(self) -> int:
         return hash(str(self.asset_type.name))
@@ -0,0 +1,277 @@
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from asset import ASSET_NUM
+from asset_site import AssetSite
+from point import Point
+from shared_state import SharedAllocator, Spec
+
+
+class AssetGrid:
+    def __init__(
+        self, size: Tuple[int, int], allocator: Optional[SharedAllocator] = None
+    ) -> None:
+        self.size = size
+        self._allocator = allocator
+        shape = (size[0], size[1], ASSET_NUM)
+        if allocator is None:
+            self._counts = np.zeros(shape, dtype=np.int32)
+        else:
+            self._counts = allocator.empty(shape, np.int32)
+            self._counts[...] = 0
+        self._totals = np.zeros(ASSET_NUM, dtype=np.int64)
+
+    @property
+    def counts(self) -> np.ndarray:
+        counts = self._counts.view()
+        counts.flags.writeable = False
+        return counts
+
+    @property
+    def cells(self) -> np.ndarray:
+        return self.counts.reshape(-1, ASSET_NUM)
+
+    @property
+    def totals(self) -> np.ndarray:
+        return self._totals.copy()
+
+    @property
+    def total(self) -> int:
+        return int(self._totals.sum())
+
+    def shared_spec(self) -> Spec:
+        if self._allocator is None:
+            raise RuntimeError("asset grid is not kept in shared memory")
+        return self._allocator.spec(self._counts)
+
+    def recount(self) -> None:
+        self._totals = self._counts.sum(axis=(0, 1), dtype=np.int64)
+
+    def lookup(self, cells: np.ndarray) -> np.ndarray:
+        return self._counts.reshape(-1, ASSET_NUM)[cells]
+
+    def occupied(self) -> Tuple[np.ndarray, np.ndarray]:
+        counts = self._counts.reshape(-1, ASSET_NUM)
+        # or-ing the columns one by one is much faster than any(axis=1) here
+        nonempty = counts[:, 0] != 0
+        for kind in range(1, ASSET_NUM):
+            nonempty |= counts[:, kind] != 0
+        cells = np.flatnonzero(nonempty)
+        return cells, counts[cells]
+
+    def add(self, cells: np.ndarray, deltas: np.ndarray) -> None:
+        cells = np.asarray(cells, dtype=np.int64)
+        deltas = np.broadcast_to(deltas, (len(cells), ASSET_NUM))
+        rows, kinds = np.nonzero(deltas)
+        np.add.at(
+            self._counts.reshape(-1),
+            cells[rows] * ASSET_NUM + kinds,
+            deltas[rows, kinds],
+        )
+        self._totals += np.sum(deltas, axis=0, dtype=np.int64)
+
+    def set_block(self, xs: slice, ys: slice, counts: np.ndarray) -> None:
+        block = self._counts[xs, ys]
+        self._totals += (counts - block).sum(axis=(0, 1), dtype=np.int64)
+        block[...] = counts
+
+    def scatter(self, cells: np.ndarray, kinds: np.ndarray) -> None:
+        units = np.bincount(cells * ASSET_NUM + kinds, minlength=self._counts.size)
+        self._counts += units.reshape(self._counts.shape).astype(self._counts.dtype)
+        self._totals += np.bincount(kinds, minlength=ASSET_NUM)
+
+    def keys(self) -> List[Point]:
+        x, y = np.nonzero(self._counts.any(axis=2))
+        return list(map(Point, x.tolist(), y.tolist()))
+
+    def values(self) -> List[AssetSite]:
+        return [self[point] for point in self.keys()]
+
+    def items(self) -> List[Tuple[Point, AssetSite]]:
+        return [(point, self[point]) for point in self.keys()]
+
+    def __getitem__(self, point: Point) -> AssetSite:
+        return AssetSite(self._counts[point.x, point.y], self._totals)
+
+    def __setitem__(self, point: Point, site: AssetSite) -> None:
+        counts = site.counts
+        self._totals += counts - self._counts[point.x, point.y]
+        self._counts[point.x, point.y] = counts
+
+    def __contains__(self, point: Point) -> bool:
+        return bool(self._counts[point.x, point.y].any())
+
+    def __iter__(self) -> Iterator[Point]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return int(self._counts.any(axis=2).sum())
+
+
+class SparseAssetGrid:
+    # only cells holding assets are stored, as sorted cell ids with one row of
+    # counts each. Per-cell writes only touch those rows: emptied rows stay
+    # until the next batch operation prunes them, and new cells wait in
+    # _pending so they are inserted together rather than one np.insert each
+    def __init__(self, size: Tuple[int, int]) -> None:
+        self.size = size
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._values = np.zeros((0, ASSET_NUM), dtype=np.int32)
+        self._totals = np.zeros(ASSET_NUM, dtype=np.int64)
+        self._pending: Dict[int, np.ndarray] = {}
+        self._emptied = False
+
+    @property
+    def totals(self) -> np.ndarray:
+        return self._totals.copy()
+
+    @property
+    def total(self) -> int:
+        return int(self._totals.sum())
+
+    def recount(self) -> None:
+        self._flush()
+        self._totals = self._values.sum(axis=0, dtype=np.int64)
+
+    def lookup(self, cells: np.ndarray) -> np.ndarray:
+        self._flush()
+        positions, found = self._find(cells)
+        counts = np.zeros((len(positions), ASSET_NUM), dtype=self._values.dtype)
+        counts[found] = self._values[positions[found]]
+        return counts
+
+    def occupied(self) -> Tuple[np.ndarray, np.ndarray]:
+        self._flush()
+        return self._keys.copy(), self._values.copy()
+
+    def add(self, cells: np.ndarray, deltas: np.ndarray) -> None:
+        keys, inverse = np.unique(cells, return_inverse=True)
+        summed = np.zeros((len(keys), ASSET_NUM), dtype=np.int64)
+        np.add.at(summed, inverse, deltas)
+        self._totals += summed.sum(axis=0)
+        self._flush()
+        self._merge(keys, summed)
+
+    def scatter(self, cells: np.ndarray, kinds: np.ndarray) -> None:
+        keys, units = np.unique(cells * ASSET_NUM + kinds, return_counts=True)
+        cells, kinds = np.divmod(keys, ASSET_NUM)
+        deltas = np.zeros((len(keys), ASSET_NUM), dtype=np.int64)
+        deltas[np.arange(len(keys)), kinds] = units
+        self.add(cells, deltas)
+
+    def keys(self) -> List[Point]:
+        self._flush()
+        x, y = np.divmod(self._keys, self.size[1])
+        return list(map(Point, x.tolist(), y.tolist()))
+
+    def values(self) -> List[AssetSite]:
+        return [self[point] for point in self.keys()]
+
+    def items(self) -> List[Tuple[Point, AssetSite]]:
+        return [(point, self[point]) for point in self.keys()]
+
+    def _find(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        cells = np.asarray(cells, dtype=np.int64)
+        positions = np.searchsorted(self._keys, cells)
+        found = np.zeros(len(cells), dtype=bool)
+        inside = positions < len(self._keys)
+        found[inside] = self._keys[positions[inside]] == cells[inside]
+        return positions, found
+
+    def _merge(self, keys: np.ndarray, deltas: np.ndarray) -> None:
+        positions, found = self._find(keys)
+        rows = positions[found]
+        self._values[rows] += deltas[found].astype(self._values.dtype)
+        emptied = rows[~self._values[rows].any(axis=1)]
+        if len(emptied):
+            self._keys = np.delete(self._keys, emptied)
+            self._values = np.delete(self._values, emptied, axis=0)
+        new = ~found & deltas.any(axis=1)
+        if new.any():
+            positions = np.searchsorted(self._keys, keys[new])
+            self._keys = np.insert(self._keys, positions, keys[new])
+            self._values = np.insert(
+                self._values, positions, deltas[new].astype(self._values.dtype), axis=0
+            )
+
+    def _flush(self) -> None:
+        if self._pending:
+            keys = np.fromiter(self._pending, dtype=np.int64, count=len(self._pending))
+            values = np.array(list(self._pending.values()), dtype=self._values.dtype)
+            self._pending = {}
+            positions = np.searchsorted(self._keys, keys)
+            self._keys = np.insert(self._keys, positions, keys)
+            self._values = np.insert(self._values, positions, values, axis=0)
+        if self._emptied:
+            self._emptied = False
+            kept = self._values.any(axis=1)
+            self._keys, self._values = self._keys[kept], self._values[kept]
+
+    def _row(self, cell: int) -> np.ndarray:
+        row = self._pending.get(cell)
+        if row is not None:
+            return row
+        position = int(np.searchsorted(self._keys, cell))
+        if position < len(self._keys) and self._keys[position] == cell:
+            return self._values[position]
+        return np.zeros(ASSET_NUM, dtype=self._values.dtype)
+
+    def _write(self, cell: int, i: int, value: int) -> None:
+        position = int(np.searchsorted(self._keys, cell))
+        if position < len(self._keys) and self._keys[position] == cell:
+            self._values[position, i] = value
+            self._emptied = self._emptied or value == 0
+            return
+        row = self._pending.get(cell)
+        if row is None:
+            if value == 0:
+                return
+            row = self._pending[cell] = np.zeros(ASSET_NUM, dtype=self._values.dtype)
+        row[i] = value
+        if not row.any():
+            del self._pending[cell]
+
+    def _cell(self, point: Point) -> int:
+        return point.x * self.size[1] + point.y
+
+    def __getitem__(self, point: Point) -> AssetSite:
+        return AssetSite(SparseRow(self, self._cell(point)), self._totals)
+
+    def __setitem__(self, point: Point, site: AssetSite) -> None:
+        cell = self._cell(point)
+        counts = site.counts
+        self._totals += np.asarray(counts) - self._row(cell)
+        for i, value in enumerate(counts):
+            self._write(cell, i, value)
+
+    def __contains__(self, point: Point) -> bool:
+        return bool(self._row(self._cell(point)).any())
+
+    def __iter__(self) -> Iterator[Point]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._keys)
+
+
+class SparseRow(Sequence):
+    # counts of one cell of a SparseAssetGrid, writes go through the grid so
+    # that missing cells are only inserted once they hold something
+    def __init__(self, grid: SparseAssetGrid, cell: int) -> None:
+        self._grid = grid
+        self._cell = cell
+
+    def __getitem__(self, i: int) -> int:
+        return int(self._grid._row(self._cell)[i])
+
+    def __setitem__(self, i: int, value: int) -> None:
+        self._grid._write(self._cell, i, value)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._grid._row(self._cell).tolist())
+
+    def __len__(self) -> int:
+        return ASSET_NUM
@@ -1,46 +1,112 @@
-from collections import defaultdict
-from itertools import chain
-from typing import List
+from random import random
+from typing import Dict, Iterator, List, Sequence, Tuple
 
-from asset import Asset, AssetType
+from asset import Asset, AssetType, ASSET_INDEX, ASSET_NUM, ASSET_TYPES
+from rng import SimulationRNG, fallback_generator
+
+
+SMALL_SAMPLE = 32
 
 
 class AssetSite:
-    def __init__(self) -> None:
-        self._assets = defaultdict(list)
-        self._total_of_type = defaultdict(int)
-        self._total_assets = 0
+    def __init__(
+        self, counts: Sequence[int] = None, totals: Sequence[int] = None
+    ) -> None:
+        self._counts = [0] * ASSET_NUM if counts is None else counts
+        self._totals = totals
+
+    @property
+    def counts(self) -> List[int]:
+        return [int(total) for total in self._counts]
 
     def get_growable_assets(self) -> List[Asset]:
-        return self._assets[AssetType.EDIBLE] + self._assets[AssetType.GROWABLE]
+        return [a for a in self if a.is_growable]
 
     def append(self, asset: Asset) -> None:
-        self._assets[asset.asset_type].append(asset)
-        self._total_of_type[asset.asset_type] += 1
-        self._total_assets += 1
+        self._change(ASSET_INDEX[asset.asset_type], 1)
 
-    def extend(self, assets: Asset) -> None:
+    def extend(self, assets: List[Asset]) -> None:
         for asset in assets:
             self.append(asset)
 
+    def add(self, asset_type: AssetType, n: int = 1) -> None:
+        self._change(ASSET_INDEX[asset_type], n)
+
+    def remove(self, asset_type: AssetType, n: int = 1) -> None:
+        if self.total_of_type(asset_type) < n:
+            raise RuntimeError(f"Site does not have {n} assets of type {asset_type}")
+        self._change(ASSET_INDEX[asset_type], -n)
+
+    def merge(self, other: "AssetSite") -> None:
+        for i, total in enumerate(other.counts):
+            self._change(i, total)
+
+    def split(
+        self, probabilities: Dict[AssetType, float], rng: SimulationRNG = None
+    ) -> Tuple["AssetSite", "AssetSite"]:
+        counts = self.counts
+        probabilities = [probabilities[asset_type] for asset_type in ASSET_TYPES]
+        # sites hold a handful of assets, buffered scalar draws beat a
+        # binomial call per split
+        draw = random if rng is None else rng.random
+        drawn = [
+            sum(1 for _ in range(total) if draw() < probability)
+            for total, probability in zip(counts, probabilities)
+        ]
+        taken = AssetSite(drawn)
+        left = AssetSite([total - k for total, k in zip(counts, drawn)])
+        return taken, left
+
+    def sample(
+        self, n: int, rng: SimulationRNG = None
+    ) -> Tuple["AssetSite", "AssetSite"]:
+        counts = self.counts
+        if n > sum(counts):
+            raise RuntimeError(f"Site does not have {n} assets to sample")
+        if n > SMALL_SAMPLE:
+            source = fallback_generator() if rng is None else rng.generator
+            drawn = source.multivariate_hypergeometric(counts, n).tolist()
+        else:
+            drawn = AssetSite._draw_without_replacement(counts, n, rng)
+        taken = AssetSite(drawn)
+        left = AssetSite([total - k for total, k in zip(counts, drawn)])
+        return taken, left
+
+    @staticmethod
+    def _draw_without_replacement(
+        counts: List[int], n: int, rng: SimulationRNG = None
+    ) -> List[int]:
+        draw = random if rng is None else rng.random
+        left, drawn, remaining = list(counts), [0] * ASSET_NUM, sum(counts)
+        for _ in range(n):
+            pick = int(draw() * remaining)
+            for i, count in enumerate(left):
+                if pick < count:
+                    break
+                pick -= count
+            left[i] -= 1
+            drawn[i] += 1
+            remaining -= 1
+        return drawn
+
     def total_of_type(self, asset_type: AssetType) -> int:
-        return self._total_of_type[asset_type]
+        return int(self._counts[ASSET_INDEX[asset_type]])
+
+    def _change(self, i: int, n: int) -> None:
+        self._counts[i] += n
+        if self._totals is not None:
+            self._totals[i] += n
+
+    def __reduce__(self) -> tuple:
+        return AssetSite, (self.counts,)
 
     def __contains__(self, asset: Asset) -> bool:
-        return self._total_of_type[asset.asset_type] > 0
+        return self.total_of_type(asset.asset_type) > 0
 
     def __len__(self) -> int:
-        return self._total_assets
-
-    def __iter__(self):
-        self._n = 0
-        self._total_assets_ref = chain(*self._assets.values())
-        return self
-
-    def __next__(self):
-        if self._n < self._total_assets:
-            result = next(self._total_assets_ref)
-            self._n += 1
-            return result
-        else:
-            raise StopIteration
+        return int(sum(self._counts))
+
+    def __iter__(self) -> Iterator[Asset]:
+        for asset_type, total in zip(ASSET_TYPES, self.counts):
+            for _ in range(total):
+                yield Asset(asset_type)
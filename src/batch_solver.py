@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field
+from typing import Callable, Tuple
+
+import numpy as np
+
+from asset import ASSET_NUM
+from conflict import CellGroups
+from rng import SimulationRNG
+
+
+@dataclass
+class ConflictBatch:
+    # one row per member, grouped by conflict exactly like groups.members
+    groups: CellGroups
+    age: np.ndarray
+    influence: np.ndarray
+    starving_days: np.ndarray
+    happiness: np.ndarray
+    preferences: np.ndarray
+    assets: np.ndarray
+    bases: np.ndarray
+    site_assets: np.ndarray
+    version: int = -1
+
+    @property
+    def members(self) -> np.ndarray:
+        return self.groups.members
+
+    @property
+    def group_index(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.groups)), self.groups.sizes)
+
+    @property
+    def slot_index(self) -> np.ndarray:
+        return np.arange(len(self.members)) - self.groups.offsets[self.group_index]
+
+    def padded(
+        self, values: np.ndarray, fill: float = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        sizes = self.groups.sizes
+        width = int(sizes.max()) if len(sizes) else 0
+        shape = (len(self.groups), width) + values.shape[1:]
+        tensor = np.full(shape, fill, dtype=values.dtype)
+        mask = np.zeros((len(self.groups), width), dtype=bool)
+        tensor[self.group_index, self.slot_index] = values
+        mask[self.group_index, self.slot_index] = True
+        return tensor, mask
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+
+@dataclass
+class BatchDecision:
+    # assets and survives have one row per batch member, site_assets one row
+    # per conflict; parents holds pairs of member rows, each pair giving
+    # birth to one child that starts with the matching offspring_assets row
+    assets: np.ndarray
+    site_assets: np.ndarray
+    survives: np.ndarray
+    parents: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, 2), dtype=np.int64)
+    )
+    offspring_assets: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, ASSET_NUM), dtype=np.int64)
+    )
+
+
+BatchSolver = Callable[[ConflictBatch, SimulationRNG], BatchDecision]
+
+
+def influence_batch_solver(
+    batch: ConflictBatch, rng: SimulationRNG = None
+) -> BatchDecision:
+    influence, mask = batch.padded(batch.influence, fill=-np.inf)
+    winners = np.zeros(len(batch.members), dtype=bool)
+    if len(batch):
+        best = np.argmax(influence, axis=1)
+        winners[batch.groups.offsets[:-1] + best] = True
+    assets = batch.assets.copy()
+    assets[winners] += batch.site_assets
+    return BatchDecision(
+        assets=assets,
+        site_assets=np.zeros_like(batch.site_assets),
+        survives=np.ones(len(batch.members), dtype=bool),
+    )
@@ -0,0 +1,172 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from batch_solver import influence_batch_solver
+from metrics import MetricsWriter
+from parallel_solver import ParallelSolver, Solver
+from snapshot import load_snapshot, save_snapshot
+from world import ENGINES, World
+from world_helper import natural_solver
+
+
+SOLVERS = ("natural", "parallel", "influence")
+# defaults of the flags that only shape a new world, a snapshot carries its own
+WORLD_DEFAULTS = {
+    "size": (100, 100),
+    "individuals": 100,
+    "populations": 10,
+    "assets": 1_000,
+    "seed": None,
+    "engine": "object",
+    "sparse": False,
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="world", description="Run a world simulation without a console loop"
+    )
+    world = parser.add_argument_group("world")
+    world.add_argument("--size", type=int, nargs=2, help="default 100 100")
+    world.add_argument("--individuals", type=int, help="default 100")
+    world.add_argument("--populations", type=int, help="default 10")
+    world.add_argument("--assets", type=int, help="default 1000")
+    world.add_argument("--seed", type=int)
+    world.add_argument(
+        "--engine",
+        choices=ENGINES,
+        help="default object, or the snapshot's engine with --resume",
+    )
+    world.add_argument(
+        "--tiles",
+        type=int,
+        nargs=2,
+        metavar=("COLUMNS", "ROWS"),
+        help="tile grid of the tiled engine, default 2 2",
+    )
+    world.add_argument("--sparse", action="store_true", default=None)
+    world.add_argument(
+        "--resume",
+        help="continue from a snapshot file instead, only --engine and --tiles"
+        " may change the resumed world",
+    )
+
+    run = parser.add_argument_group("run")
+    run.add_argument(
+        "--ticks", type=int, help="stop after this many ticks, default at extinction"
+    )
+    run.add_argument("--solver", choices=SOLVERS, default="natural")
+    run.add_argument(
+        "--workers", type=int, help="processes of the parallel solver, default all"
+    )
+    run.add_argument(
+        "--print-every",
+        type=int,
+        default=0,
+        help="print the indicators every N ticks, default never",
+    )
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--metrics", help="directory of the per-tick metrics")
+    output.add_argument("--checkpoint", help="snapshot file written while running")
+    output.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=0,
+        help="ticks between snapshots, default only at the end",
+    )
+    output.add_argument(
+        "--profile", action="store_true", help="print per-phase timings at the end"
+    )
+    output.add_argument("--profile-tick", type=int, help="cProfile this tick")
+    output.add_argument("--profile-path", default="tick.prof")
+    args = parser.parse_args(argv)
+
+    for name, default in WORLD_DEFAULTS.items():
+        if getattr(args, name) is None:
+            if not args.resume:
+                setattr(args, name, default)
+        elif args.resume and name != "engine":
+            parser.error(f"--{name} cannot be combined with --resume")
+    return args
+
+
+def make_world(args: argparse.Namespace) -> World:
+    tiles = tuple(args.tiles) if args.tiles else None
+    if args.resume:
+        return load_snapshot(args.resume, engine=args.engine, tiles=tiles)
+    return World(
+        size=tuple(args.size),
+        initial_individuals=args.individuals,
+        initial_populations=args.populations,
+        initial_assets=args.assets,
+        engine=args.engine,
+        seed=args.seed,
+        sparse=args.sparse,
+        **({"tiles": tiles} if tiles else {}),
+    )
+
+
+def make_solver(args: argparse.Namespace) -> Optional[Solver]:
+    if args.solver == "parallel":
+        return ParallelSolver(workers=args.workers)
+    if args.solver == "natural":
+        return natural_solver
+    return None
+
+
+def solve(world: World, solver: Optional[Solver]) -> None:
+    if solver is None:
+        world.solve_batch(influence_batch_solver)
+    else:
+        world.solve_conflicts(solver(world.get_conflicts(), world.rng))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    world = make_world(args)
+    solver = make_solver(args)
+    if args.profile or args.profile_tick is not None:
+        profiler = world.enable_profiling(args.profile_tick, args.profile_path)
+    writer = None
+    if args.metrics:
+        writer = MetricsWriter(world, args.metrics, append=bool(args.resume))
+
+    done = 0
+    try:
+        while args.ticks is None or done < args.ticks:
+            solve(world, solver)
+            if writer is not None:
+                writer.record()
+            if args.print_every and world.tick % args.print_every == 0:
+                print(json.dumps(world.indicators))
+            if len(world.population) == 0:
+                break
+            world.move_time()
+            done += 1
+            if args.checkpoint and args.checkpoint_every:
+                if world.tick % args.checkpoint_every == 0:
+                    save_snapshot(world, args.checkpoint)
+        # an interrupted tick is left half applied, so only a run that
+        # stopped between ticks replaces the last checkpoint
+        if args.checkpoint:
+            save_snapshot(world, args.checkpoint)
+    finally:
+        if isinstance(solver, ParallelSolver):
+            solver.close()
+        if writer is not None:
+            writer.close()
+        world.close()
+
+    summary = {"ticks": done, "tick": world.tick, **world.indicators}
+    print(json.dumps(summary))
+    if args.profile:
+        for phase, stats in profiler.stats().items():
+            print(
+                f"{phase:20} {1000 * stats.mean:10.3f}ms mean"
+                f" {1000 * stats.max:10.3f}ms max over {stats.ticks} ticks",
+                file=sys.stderr,
+            )
+    return 0
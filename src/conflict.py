@@ -1,6 +1,9 @@
+from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import List
 
+import numpy as np
+
 from asset_site import AssetSite
 from individual import Individual
 from point import Point
@@ -11,3 +14,39 @@ class Conflict:
     place: Point
     individuals: List[Individual] = field(default_factory=lambda: [])
     assets: AssetSite = field(default_factory=lambda: AssetSite())
+
+
+@dataclass
+class CellGroups:
+    # members[offsets[i]:offsets[i + 1]] are the population rows standing on
+    # cells[i], cells ascending and rows ascending within a cell
+    cells: np.ndarray
+    offsets: np.ndarray
+    members: np.ndarray
+
+    @classmethod
+    def from_cells(cls, cells: np.ndarray) -> CellGroups:
+        members = np.argsort(cells, kind="stable")
+        ordered = cells[members]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        if len(cells) == 0:
+            starts = starts[:0]
+        return cls(ordered[starts], np.append(starts, len(cells)), members)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def select(self, groups: np.ndarray) -> CellGroups:
+        groups = np.flatnonzero(groups) if groups.dtype == bool else groups
+        sizes = self.sizes[groups]
+        offsets = np.append(0, np.cumsum(sizes))
+        starts = np.repeat(self.offsets[groups] - offsets[:-1], sizes)
+        members = self.members[starts + np.arange(offsets[-1])]
+        return CellGroups(self.cells[groups], offsets, members)
+
+    def members_of(self, group: int) -> np.ndarray:
+        return self.members[self.offsets[group] : self.offsets[group + 1]]
+
+    def __len__(self) -> int:
+        return len(self.cells)
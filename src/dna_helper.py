@@ -1,17 +1,75 @@
 from random import choices
 from typing import List
 
+import numpy as np
+
 from constants import *
+from rng import SimulationRNG, fallback_generator
 
 
 DNA = List[str]
+DNA_PAD = 255
+BASE_CODES = {base: code for code, base in enumerate(DNA_BASES)}
 
 
 # Creates a new random DNA from bases with size
-def new_dna(bases: str = DNA_BASES, size: int = DNA_SIZE) -> DNA:
-    return choices(bases, k=size)
+def new_dna(
+    bases: str = DNA_BASES, size: int = DNA_SIZE, rng: SimulationRNG = None
+) -> DNA:
+    if rng is None:
+        return choices(bases, k=size)
+    return rng.choices(bases, k=size)
+
+
+# Creates n rows of random base codes, the array counterpart of new_dna
+def new_codes(n: int, size: int = DNA_SIZE, rng: SimulationRNG = None) -> np.ndarray:
+    source = fallback_generator() if rng is None else rng.generator
+    return source.integers(0, len(DNA_BASES), (n, size), dtype=np.uint8)
 
 
 # Creates a new DNA by sampling elements from the two other DNA sequences
-def combine_dna(dna1: DNA, dna2: DNA, size: int = DNA_SIZE) -> DNA:
-    return new_dna(dna1 + dna2, size)
+def combine_dna(
+    dna1: DNA, dna2: DNA, size: int = DNA_SIZE, rng: SimulationRNG = None
+) -> DNA:
+    return new_dna(dna1 + dna2, size, rng)
+
+
+# Combines two rows of base codes into one child, the single row counterpart
+# of combine_codes for the object paths
+def combine_code_row(
+    codes1: List[int],
+    codes2: List[int],
+    size: int = DNA_SIZE,
+    rng: SimulationRNG = None,
+) -> np.ndarray:
+    pool = [code for code in codes1 + codes2 if code != DNA_PAD]
+    return np.array(new_dna(pool, size, rng), dtype=np.uint8)
+
+
+# Combines rows of base codes like combine_dna, one child per pair of rows
+def combine_codes(
+    codes1: np.ndarray,
+    codes2: np.ndarray,
+    size: int = DNA_SIZE,
+    rng: SimulationRNG = None,
+) -> np.ndarray:
+    source = fallback_generator() if rng is None else rng.generator
+    # padding has the highest code, so sorting packs every pool's bases first
+    pool = np.sort(np.concatenate([codes1, codes2], axis=1), axis=1)
+    lengths = (pool != DNA_PAD).sum(axis=1)
+    picks = (source.random((len(pool), size)) * lengths[:, None]).astype(np.int64)
+    return np.take_along_axis(pool, picks, axis=1)
+
+
+# Encodes a DNA as a row of base codes, padded up to size
+def encode_dna(dna: DNA, size: int = DNA_SIZE) -> np.ndarray:
+    if len(dna) > size:
+        raise RuntimeError(f"DNA of length {len(dna)} does not fit in {size} bases")
+    codes = np.full(size, DNA_PAD, dtype=np.uint8)
+    codes[: len(dna)] = [BASE_CODES[base] for base in dna]
+    return codes
+
+
+# Decodes a row of base codes back into a DNA, dropping the padding
+def decode_dna(codes: np.ndarray) -> DNA:
+    return [DNA_BASES[code] for code in codes.tolist() if code != DNA_PAD]
@@ -0,0 +1,128 @@
+from functools import lru_cache
+from typing import Callable, Tuple
+
+import numpy as np
+
+from asset import ASSET_INDEX, ASSET_NUM, AssetType, GROWABLE_TYPES
+from constants import (
+    ASSET_MAX_FOR_TYPE_IN_POINT,
+    ASSET_REPRODUCTION_PROBABILITY,
+    INDIVIDUAL_DAILY_STARVATION_PROBABILITY,
+    INDIVIDUAL_DEATH_PROBABILITY,
+    INDIVIDUAL_MAX_AGE,
+)
+
+EDIBLE = ASSET_INDEX[AssetType.EDIBLE]
+GROWABLE = [ASSET_INDEX[asset_type] for asset_type in GROWABLE_TYPES]
+
+
+def influences(
+    distance: np.ndarray, age: np.ndarray, wealth: np.ndarray, world_wealth: float
+) -> np.ndarray:
+    influence = np.ones(len(distance))
+    if world_wealth > 0:
+        valid = distance > 0
+        influence[valid] = (
+            (1.0 / distance[valid])
+            * age[valid]
+            / float(INDIVIDUAL_MAX_AGE)
+            * wealth[valid]
+            / world_wealth
+        )
+    return influence
+
+
+@lru_cache(maxsize=None)
+def death_table(death: float, starvation: float, max_age: int) -> np.ndarray:
+    # indexed by starving days; nobody starves for longer than they can live,
+    # so longer streaks share the last entry
+    days = np.arange(max_age + 2)
+    table = np.minimum(death + (1 + starvation) ** days - 1, 1.0)
+    table.flags.writeable = False
+    return table
+
+
+def deaths(
+    age: np.ndarray, starving_days: np.ndarray, uniforms: np.ndarray
+) -> np.ndarray:
+    table = death_table(
+        INDIVIDUAL_DEATH_PROBABILITY,
+        INDIVIDUAL_DAILY_STARVATION_PROBABILITY,
+        INDIVIDUAL_MAX_AGE,
+    )
+    probability = table[np.minimum(starving_days, len(table) - 1)]
+    return (uniforms < probability) | (age > INDIVIDUAL_MAX_AGE)
+
+
+def reproduce(
+    cells: np.ndarray, growable: np.ndarray, rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray]:
+    rows, kinds = np.nonzero(growable)
+    units = rng.binomial(growable[rows, kinds], ASSET_REPRODUCTION_PROBABILITY)
+    return np.repeat(cells[rows], units), np.repeat(np.asarray(GROWABLE)[kinds], units)
+
+
+def settle_offspring(
+    cells: np.ndarray, kinds: np.ndarray, lookup: Callable[[np.ndarray], np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    # a target only grows up to the room it had before this round, so the
+    # outcome does not depend on the order offspring were drawn in
+    keys, offspring = np.unique(cells * ASSET_NUM + kinds, return_counts=True)
+    targets, kinds = np.divmod(keys, ASSET_NUM)
+    rows = np.arange(len(keys))
+    room = np.maximum(ASSET_MAX_FOR_TYPE_IN_POINT - lookup(targets)[rows, kinds], 0)
+    deltas = np.zeros((len(keys), ASSET_NUM), dtype=np.int64)
+    deltas[rows, kinds] = np.minimum(offspring, room)
+    return targets, deltas
+
+
+class VectorizedEngine:
+    def __init__(self, world: "World") -> None:
+        self.world = world
+
+    @property
+    def rng(self) -> np.random.Generator:
+        return self.world.rng.generator
+
+    @property
+    def num_cells(self) -> int:
+        return self.world.size[0] * self.world.size[1]
+
+    def move_time(self) -> None:
+        self.collect_assets()
+        self.regenerate_assets()
+        self.age_individuals()
+        self.update_influences()
+        self.move_individuals()
+
+    def collect_assets(self) -> None:
+        population = self.world.population
+        grid = self.world.site_positions
+        cells = self._cells()
+        _, inverse, occupancy = np.unique(
+            cells, return_inverse=True, return_counts=True
+        )
+        solo = np.flatnonzero(occupancy[inverse] == 1)
+        solo_cells = cells[solo]
+        taken = self.rng.binomial(grid.lookup(solo_cells), population.preferences[solo])
+        population.change_assets(solo, taken)
+        grid.add(solo_cells, -taken)
+
+    def regenerate_assets(self) -> None:
+        self.world._regenerate_assets()
+
+    def age_individuals(self) -> None:
+        self.world._age_individuals()
+
+    def update_influences(self) -> None:
+        self.world._update_influences()
+
+    def move_individuals(self) -> None:
+        self.world._move_individuals()
+
+    def _cells(self) -> np.ndarray:
+        population = self.world.population
+        return self._cell_ids(population.x, population.y)
+
+    def _cell_ids(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return x * self.world.size[1] + y
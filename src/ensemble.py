@@ -0,0 +1,110 @@
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from conflict import Conflict
+from rng import SimulationRNG
+from world import World
+from world_helper import natural_solver
+
+
+FIELDS = ("total_population", "avg_happines", "avg_age")
+# z score of a two sided 95% normal confidence interval
+CONFIDENCE_Z = 1.96
+
+Solver = Callable[[List[Conflict], SimulationRNG], List[Conflict]]
+
+
+@dataclass
+class EnsembleStats:
+    # per tick and field running count, mean and sum of squared deviations,
+    # folded one replica at a time (Welford) so no trajectory is kept
+    ticks: int
+    count: np.ndarray = field(init=False)
+    mean: np.ndarray = field(init=False)
+    m2: np.ndarray = field(init=False)
+    extinct: np.ndarray = field(init=False)
+    replicas: int = 0
+
+    def __post_init__(self) -> None:
+        shape = (self.ticks, len(FIELDS))
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.extinct = np.zeros(self.ticks, dtype=np.int64)
+
+    def add(self, trajectory: np.ndarray) -> None:
+        # an extinct replica counts with no population for the rest of the
+        # run, but has no mean age nor happiness from then on
+        values = np.zeros((self.ticks, len(FIELDS)))
+        values[: len(trajectory)] = trajectory
+        alive = values[:, 0] > 0
+        present = np.repeat(alive[:, None], len(FIELDS), axis=1)
+        present[:, 0] = True
+        if not alive.all():
+            self.extinct[np.argmin(alive) :] += 1
+
+        self.count += present
+        delta = np.where(present, values - self.mean, 0.0)
+        self.mean += delta / np.maximum(self.count, 1)
+        self.m2 += delta * np.where(present, values - self.mean, 0.0)
+        self.replicas += 1
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+
+    def band(
+        self, name: str, z: float = CONFIDENCE_Z
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        column = FIELDS.index(name)
+        mean = self.mean[:, column]
+        error = z * self.std[:, column] / np.sqrt(np.maximum(self.count[:, column], 1))
+        return mean, mean - error, mean + error
+
+
+def run_replica(
+    seed: int, ticks: int, world_kwargs: Dict[str, Any], solver: Solver
+) -> np.ndarray:
+    world = World(seed=seed, **world_kwargs)
+    trajectory = np.zeros((ticks, len(FIELDS)))
+    for tick in range(ticks):
+        world.solve_conflicts(solver(world.get_conflicts(), world.rng))
+        indicators = world.indicators
+        trajectory[tick] = [indicators[name] for name in FIELDS]
+        if indicators["total_population"] == 0:
+            trajectory = trajectory[: tick + 1]
+            break
+        world.move_time()
+    world.close()
+    return trajectory
+
+
+def _run_task(task: Tuple) -> np.ndarray:
+    return run_replica(*task)
+
+
+def run_ensemble(
+    replicas: int,
+    ticks: int,
+    seed: Optional[int] = None,
+    processes: Optional[int] = None,
+    solver: Solver = natural_solver,
+    **world_kwargs: Any,
+) -> EnsembleStats:
+    # replicas are handed out one at a time, so a worker whose world went
+    # extinct early picks up the next one, and only finished trajectories
+    # are sent back to be folded in
+    seeds = np.random.SeedSequence(seed).generate_state(replicas, dtype=np.uint64)
+    tasks = [(int(s), ticks, world_kwargs, solver) for s in seeds]
+    stats = EnsembleStats(ticks)
+    if processes == 1:
+        for task in tasks:
+            stats.add(_run_task(task))
+        return stats
+    with get_context().Pool(processes) as pool:
+        for trajectory in pool.imap_unordered(_run_task, tasks):
+            stats.add(trajectory)
+    return stats
@@ -1,73 +1,230 @@
 from __future__ import annotations
 from collections import Counter
-from dataclasses import dataclass, field
-from random import random, sample, shuffle
-from typing import Dict, List
+import threading
+from collections.abc import MutableMapping
+from random import random, sample
+from typing import Dict, Iterator, List, Union
 
-from asset import Asset, AssetType, ASSET_NUM, ASSET_TYPES
+import numpy as np
+
+from asset import Asset, AssetType, ASSET_INDEX, ASSET_NUM, ASSET_TYPES
 from asset_site import AssetSite
 from constants import *
-from dna_helper import combine_dna, DNA, new_dna
+from dna_helper import (
+    BASE_CODES,
+    combine_code_row,
+    decode_dna,
+    DNA,
+    encode_dna,
+    new_codes,
+)
+from engine import death_table
+from population import Population
+from rng import SimulationRNG
+
+
+# rows of individuals that live in no world yet, e.g. newborns until they are
+# settled, one population per thread so a birth only appends a row
+NURSERY_SLACK = 1024
+
+_nurseries = threading.local()
+
+
+def nursery() -> Population:
+    population = getattr(_nurseries, "population", None)
+    if population is None:
+        population = _nurseries.population = Population(capacity=NURSERY_SLACK)
+    population.prune(NURSERY_SLACK)
+    return population
+
+
+class Preferences(MutableMapping):
+    def __init__(self, individual: Individual) -> None:
+        self._individual = individual
+
+    def __getitem__(self, asset_type: AssetType) -> float:
+        individual = self._individual
+        return individual._population.value(
+            "preferences", (individual._index, ASSET_INDEX[asset_type])
+        )
+
+    def __setitem__(self, asset_type: AssetType, value: float) -> None:
+        individual = self._individual
+        individual._population.set_preferences(
+            (individual._index, ASSET_INDEX[asset_type]), value
+        )
+
+    def __delitem__(self, asset_type: AssetType) -> None:
+        raise RuntimeError(f"cannot remove preference for {asset_type}")
+
+    def __iter__(self) -> Iterator[AssetType]:
+        return iter(ASSET_TYPES)
+
+    def __len__(self) -> int:
+        return ASSET_NUM
 
 
-@dataclass
 class Individual:
-    dna: DNA
-    influence: int
-    preferences: Dict[AssetType, float]
-    age: int = 0
-    assets: List[Asset] = field(default_factory=lambda: [])
-    starving_days: int = 0
+    __slots__ = ("_population", "_index", "__weakref__")
+
+    def __init__(
+        self,
+        dna: Union[DNA, np.ndarray],
+        influence: int,
+        preferences: Dict[AssetType, float],
+        age: int = 0,
+        assets: List[Asset] = None,
+        starving_days: int = 0,
+    ) -> None:
+        population = nursery()
+        index = population.add(
+            dna=dna if isinstance(dna, np.ndarray) else encode_dna(dna),
+            preferences=[preferences[at] for at in ASSET_TYPES],
+            age=age,
+            influence=influence,
+            starving_days=starving_days,
+            assets=Individual._count_assets(assets or []),
+        )
+        population.bind_view(self, index)
+
+    @property
+    def dna(self) -> DNA:
+        return decode_dna(self._population.dna[self._index])
+
+    @dna.setter
+    def dna(self, dna: DNA) -> None:
+        self._population.set_dna(
+            self._index, encode_dna(dna, self._population.dna_size)
+        )
+
+    @property
+    def dna_codes(self) -> np.ndarray:
+        return self._population.dna[self._index]
+
+    @property
+    def influence(self) -> float:
+        return self._population.value("influence", self._index)
+
+    @influence.setter
+    def influence(self, influence: float) -> None:
+        self._population.influence[self._index] = influence
+
+    @property
+    def preferences(self) -> Preferences:
+        return Preferences(self)
+
+    @preferences.setter
+    def preferences(self, preferences: Dict[AssetType, float]) -> None:
+        self._population.set_preferences(
+            self._index, [preferences[at] for at in ASSET_TYPES]
+        )
+
+    @property
+    def age(self) -> int:
+        return self._population.value("age", self._index)
+
+    @age.setter
+    def age(self, age: int) -> None:
+        self._population.set_row_age(self._index, age)
+
+    @property
+    def assets(self) -> List[Asset]:
+        counts = self._population.row("assets", self._index)
+        return [Asset(at) for at, n in zip(ASSET_TYPES, counts) for _ in range(n)]
+
+    @assets.setter
+    def assets(self, assets: List[Asset]) -> None:
+        self._population.set_row_assets(self._index, Individual._count_assets(assets))
+
+    @property
+    def inventory(self) -> AssetSite:
+        return AssetSite(self._population.row("assets", self._index))
+
+    @property
+    def starving_days(self) -> int:
+        return self._population.value("starving_days", self._index)
+
+    @starving_days.setter
+    def starving_days(self, starving_days: int) -> None:
+        self._population.starving_days[self._index] = starving_days
 
     @property
     def preferred_asset_type(self) -> AssetType:
-        return sorted(self.preferences.items(), key=lambda p: p[1], reverse=True)[0][0]
+        preferences = self._population.preferences[self._index]
+        return ASSET_TYPES[int(np.argmax(preferences))]
 
     @property
     def happiness(self) -> float:
-        return (
-            sum([self.preferences[a.asset_type] for a in self.assets])
-            * INDIVIDUAL_HAPPINESS_UNIT
-        )
+        happiness = self._population.value("happiness", self._index)
+        return happiness * INDIVIDUAL_HAPPINESS_UNIT
+
+    @classmethod
+    def from_population(cls, population: Population, index: int) -> Individual:
+        individual = population.get_view(index)
+        if individual is None:
+            individual = cls.__new__(cls)
+            population.bind_view(individual, index)
+        return individual
 
     @classmethod
-    def make_from_parents(cls, parent1: Individual, parent2: Individual) -> Individual:
+    def make_from_parents(
+        cls, parent1: Individual, parent2: Individual, rng: SimulationRNG = None
+    ) -> Individual:
         return cls(
-            dna=combine_dna(parent1.dna, parent2.dna),
+            dna=combine_code_row(
+                parent1._population.row("dna", parent1._index),
+                parent2._population.row("dna", parent2._index),
+                rng=rng,
+            ),
             influence=0,
-            preferences=Individual._preferences_from_parents(parent1, parent2),
+            preferences=Individual._preferences_from_parents(parent1, parent2, rng),
         )
 
     @classmethod
-    def make_from_atoms(cls) -> Individual:
+    def make_from_atoms(cls, rng: SimulationRNG = None) -> Individual:
         return cls(
-            dna=new_dna(),
+            dna=new_codes(1, rng=rng)[0],
             influence=0,
-            preferences=Individual._preferences_from_atoms(),
+            preferences=Individual._preferences_from_atoms(rng),
         )
 
     @classmethod
-    def get_individuals(cls, size: int) -> List[Individual]:
-        return [cls.make_from_atoms() for _ in range(size)]
+    def get_individuals(cls, size: int, rng: SimulationRNG = None) -> List[Individual]:
+        return [cls.make_from_atoms(rng) for _ in range(size)]
 
     @staticmethod
     def avg_dna_counts(population: List[Individual]) -> Counter:
-        all_bases = Counter()
-        total_individuals = len(population)
-        for individual in population:
-            all_bases.update(individual.dna)
-        for b in all_bases:
-            all_bases[b] /= total_individuals
-        return all_bases
+        totals = sum(
+            individual._population.bases[individual._index] for individual in population
+        )
+        return Counter(
+            {
+                base: total / len(population)
+                for base, total in zip(DNA_BASES, np.ravel(totals).tolist())
+                if total
+            }
+        )
+
+    @staticmethod
+    def _count_assets(assets: List[Asset]) -> List[int]:
+        counts = [0] * ASSET_NUM
+        for asset in assets:
+            counts[ASSET_INDEX[asset.asset_type]] += 1
+        return counts
 
     @staticmethod
     def _preferences_from_parents(
-        parent1: Individual, parent2: Individual
+        parent1: Individual, parent2: Individual, rng: SimulationRNG = None
     ) -> Dict[AssetType, float]:
-        randomness = (random() * 2 - 1) * PREFERENCE_RANDOMNESS_DELTA
+        draw = random if rng is None else rng.random
+        randomness = (draw() * 2 - 1) * PREFERENCE_RANDOMNESS_DELTA
+        preferences1 = parent1._population.row("preferences", parent1._index)
+        preferences2 = parent2._population.row("preferences", parent2._index)
         preferences = {
-            at: (parent1.preferences[at] + parent2.preferences[at]) / 2.0
-            for at in ASSET_TYPES
+            at: (preference1 + preference2) / 2.0
+            for at, preference1, preference2 in zip(
+                ASSET_TYPES, preferences1, preferences2
+            )
         }
         for at in ASSET_TYPES:
             preferences[at] = min(
@@ -77,95 +234,121 @@ class Individual:
         return preferences
 
     @staticmethod
-    def _preferences_from_atoms() -> Dict[AssetType, float]:
+    def _preferences_from_atoms(rng: SimulationRNG = None) -> Dict[AssetType, float]:
         step = (PREFERENCE_MAX_VALUE - PREFERENCE_MIN_VALUE) / (ASSET_NUM - 1)
         preferences = [PREFERENCE_MIN_VALUE + i * step for i in range(ASSET_NUM)]
-        random_types = sample(ASSET_TYPES, k=ASSET_NUM)
+        random_types = (sample if rng is None else rng.sample)(ASSET_TYPES, k=ASSET_NUM)
         return dict(zip(random_types, preferences))
 
     def get_preference_for_asset_type(self, asset_type: AssetType) -> float:
         return self.preferences[asset_type]
 
+    def total_of_type(self, asset_type: AssetType) -> int:
+        return self._population.value("assets", (self._index, ASSET_INDEX[asset_type]))
+
     def has_asset_type(self, asset_type: AssetType) -> bool:
-        return any([a.asset_type == asset_type for a in self.assets])
+        return self.total_of_type(asset_type) > 0
 
     def grant_asset(self, asset: Asset) -> None:
-        self.assets.append(asset)
+        self._population.change_cell_asset(
+            self._index, ASSET_INDEX[asset.asset_type], 1
+        )
 
     def grant_many_assets(self, assets: List[Asset]) -> None:
-        self.assets.extend(assets)
+        self._population.change_row_assets(
+            self._index, Individual._count_assets(assets)
+        )
 
     def revoke(self, asset_type: AssetType) -> Asset:
-        for i in range(len(self.assets)):
-            if self.assets[i].asset_type == asset_type:
-                return self.assets.pop(i)
+        if self.has_asset_type(asset_type):
+            self._population.change_cell_asset(self._index, ASSET_INDEX[asset_type], -1)
+            return Asset(asset_type)
         raise RuntimeError(f"Individual does not have asset of type {asset_type}")
 
-    def inherit(self, parent: Individual) -> None:
-        self.grant_many_assets(parent.leave_heritage())
+    def consume(self, asset_type: AssetType) -> bool:
+        if self.has_asset_type(asset_type):
+            self._population.change_cell_asset(self._index, ASSET_INDEX[asset_type], -1)
+            return True
+        return False
 
-    def leave_heritage(self) -> List[Asset]:
-        shuffle(self.assets)
-        l = len(self.assets)
-        hl = int(l / 2)
-        heritage, self.assets = self.assets[:hl], self.assets[hl:]
+    def inherit(self, parent: Individual, rng: SimulationRNG = None) -> None:
+        heritage = parent.leave_heritage(rng)
+        self._population.change_row_assets(self._index, heritage.counts)
+
+    def leave_heritage(self, rng: SimulationRNG = None) -> AssetSite:
+        inventory = self.inventory
+        heritage, kept = inventory.sample(int(len(inventory) / 2), rng)
+        self._population.set_row_assets(self._index, kept.counts)
         return heritage
 
-    def collect_assets(self, assets: AssetSite) -> AssetSite:
-        left_behind = AssetSite()
-        for asset in assets:
-            preference = self.get_preference_for_asset_type(asset.asset_type)
-            if random() < preference:
-                self.grant_asset(asset)
-            else:
-                left_behind.append(asset)
+    def collect_assets(self, assets: AssetSite, rng: SimulationRNG = None) -> AssetSite:
+        preferences = self._population.row("preferences", self._index)
+        taken, left_behind = assets.split(dict(zip(ASSET_TYPES, preferences)), rng)
+        self._population.change_row_assets(self._index, taken.counts)
         return left_behind
 
-    def get_old(self, units: int) -> bool:
+    def get_old(self, units: int, rng: SimulationRNG = None) -> bool:
+        draw = random if rng is None else rng.random
         self.age += units
 
-        for i in range(len(self.assets)):
-            if self.assets[i].is_edible:
-                self.assets.pop(i)
-                self.starving_days = 0
-                break
+        if self.consume(AssetType.EDIBLE):
+            self.starving_days = 0
         else:
             self.starving_days += 1
 
-        starve_probability = (
-            1 + INDIVIDUAL_DAILY_STARVATION_PROBABILITY
-        ) ** self.starving_days - 1
-        if (
-            random() < (INDIVIDUAL_DEATH_PROBABILITY + starve_probability)
-            or self.age > INDIVIDUAL_MAX_AGE
-        ):
+        table = death_table(
+            INDIVIDUAL_DEATH_PROBABILITY,
+            INDIVIDUAL_DAILY_STARVATION_PROBABILITY,
+            INDIVIDUAL_MAX_AGE,
+        )
+        probability = table[min(self.starving_days, len(table) - 1)]
+        if draw() < probability or self.age > INDIVIDUAL_MAX_AGE:
             return False
         return True
 
     def dna_distance(self, avg_dna: Counter) -> float:
-        dna = Counter(self.dna)
-        return sum([(avg - dna[base]) ** 2 for base, avg in avg_dna.items()])
+        bases = self._population.row("bases", self._index)
+        return sum(
+            [(avg - bases[BASE_CODES[base]]) ** 2 for base, avg in avg_dna.items()]
+        )
 
     def fight(self, other: Individual) -> List[Individual]:
         if self.influence < other.influence:
-            other.grant_many_assets(self.assets)
+            self.transfer_assets(other)
             return [other]
         elif self.influence > other.influence:
-            self.grant_many_assets(other.assets)
+            other.transfer_assets(self)
             return [self]
         else:
             return [self, other]
 
-    def reproduce_with(self, other: Individual) -> List[Individual]:
-        child = Individual.make_from_parents(self, other)
-        child.inherit(self)
-        child.inherit(other)
+    def transfer_assets(self, other: Individual) -> None:
+        counts = self._population.row("assets", self._index)
+        self._population.set_row_assets(self._index, [0] * ASSET_NUM)
+        other._population.change_row_assets(other._index, counts)
+
+    def reproduce_with(
+        self, other: Individual, rng: SimulationRNG = None
+    ) -> List[Individual]:
+        child = Individual.make_from_parents(self, other, rng)
+        child.inherit(self, rng)
+        child.inherit(other, rng)
         return [self, child, other]
 
+    def __reduce__(self) -> tuple:
+        return Individual.from_population, (self._population.take([self._index]), 0)
+
+    def __repr__(self) -> str:
+        return (
+            f"Individual(dna={self.dna}, influence={self.influence}, "
+            f"preferences={dict(self.preferences)}, age={self.age}, "
+            f"assets={self.assets}, starving_days={self.starving_days})"
+        )
+
     def __hash__(self) -> int:
-        dna = "-".join(self.dna)
+        dna = self.dna_codes.tobytes()
         influence = str(self.influence)
         preferences = "-".join(map(str, self.preferences.items()))
         age = str(self.age)
-        assets = tuple(self.assets)
+        assets = tuple(self._population.row("assets", self._index))
         return hash((dna, influence, preferences, age, assets))
@@ -0,0 +1,122 @@
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from asset import ASSET_TYPES
+from constants import INDIVIDUAL_HAPPINESS_UNIT
+from world import World
+
+
+BLOCK_SIZE = 65_536
+SCHEMA_FILE = "schema.json"
+FIELDS: List[Tuple[str, str]] = [
+    ("tick", "<i8"),
+    ("population", "<i8"),
+    ("avg_age", "<f8"),
+    ("avg_happiness", "<f8"),
+    *((f"assets_{asset_type.name.lower()}", "<i8") for asset_type in ASSET_TYPES),
+    ("conflicts", "<i8"),
+    ("births", "<i8"),
+    ("deaths", "<i8"),
+]
+
+
+class MetricsWriter:
+    # one file of fixed-width values per field, appended a whole block at a
+    # time so that recording a tick is only a few array stores
+    def __init__(
+        self,
+        world: World,
+        path: str,
+        block_size: int = BLOCK_SIZE,
+        append: bool = False,
+    ) -> None:
+        self.world = world
+        self.path = path
+        self.block_size = block_size
+        os.makedirs(path, exist_ok=True)
+        schema = os.path.join(path, SCHEMA_FILE)
+        if append and os.path.exists(schema):
+            self._truncate(world.tick)
+        else:
+            append = False
+            with open(schema, "w") as f:
+                json.dump({"fields": FIELDS}, f)
+        self._columns = {
+            name: np.zeros(block_size, dtype=dtype) for name, dtype in FIELDS
+        }
+        mode = "ab" if append else "wb"
+        self._files = {
+            name: open(os.path.join(path, f"{name}.bin"), mode) for name, _ in FIELDS
+        }
+        self._rows = 0
+        self._births = world.births
+        self._deaths = world.deaths
+
+    def record(self) -> None:
+        world, population, row = self.world, self.world.population, self._rows
+        columns = self._columns
+        size = len(population)
+        columns["tick"][row] = world.tick
+        columns["population"][row] = size
+        columns["avg_age"][row] = population.age_total / max(size, 1)
+        columns["avg_happiness"][row] = (
+            population.happiness_total * INDIVIDUAL_HAPPINESS_UNIT / max(size, 1)
+        )
+        totals = population.assets_total + world.site_positions.totals
+        for asset_type, total in zip(ASSET_TYPES, totals.tolist()):
+            columns[f"assets_{asset_type.name.lower()}"][row] = total
+        columns["conflicts"][row] = world.conflict_count()
+        columns["births"][row] = world.births - self._births
+        columns["deaths"][row] = world.deaths - self._deaths
+        self._births, self._deaths = world.births, world.deaths
+        self._rows += 1
+        if self._rows == self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for name, f in self._files.items():
+            f.write(self._columns[name][: self._rows].tobytes())
+            f.flush()
+        self._rows = 0
+
+    def close(self) -> None:
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+    def _truncate(self, tick: int) -> None:
+        # rows recorded after the snapshot being resumed from are recorded
+        # again, as are the columns a killed run left ahead of the others
+        with open(os.path.join(self.path, SCHEMA_FILE)) as f:
+            fields = [tuple(field) for field in json.load(f)["fields"]]
+        if fields != FIELDS:
+            raise RuntimeError(f"metrics in {self.path} have a different schema")
+        rows = int(np.searchsorted(np.array(read_metrics(self.path)["tick"]), tick))
+        for name, dtype in FIELDS:
+            with open(os.path.join(self.path, f"{name}.bin"), "r+b") as f:
+                f.truncate(rows * np.dtype(dtype).itemsize)
+
+    def __enter__(self) -> "MetricsWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def read_metrics(path: str) -> Dict[str, np.ndarray]:
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        fields = json.load(f)["fields"]
+    columns = {}
+    for name, dtype in fields:
+        file = os.path.join(path, f"{name}.bin")
+        rows = os.path.getsize(file) // np.dtype(dtype).itemsize
+        if rows == 0:
+            columns[name] = np.zeros(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(file, dtype=dtype, mode="r", shape=(rows,))
+    # a run killed mid-flush may leave some columns ahead of the others
+    rows = min(len(column) for column in columns.values())
+    return {name: column[:rows] for name, column in columns.items()}
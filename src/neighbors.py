@@ -0,0 +1,49 @@
+from typing import Tuple
+
+import numpy as np
+
+from point import Point
+
+
+NEIGHBOR_OFFSETS = np.array(
+    [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+)
+
+
+class NeighborTable:
+    # valid neighbours only depend on which borders a cell touches, so the
+    # table is kept per border class instead of per cell: bits 0 and 1 flag
+    # x == 0 and x == width - 1, bits 2 and 3 do the same for y
+    def __init__(self, size: Tuple[int, int]) -> None:
+        self.size = size
+        self.offsets = np.zeros((16, len(NEIGHBOR_OFFSETS), 2), dtype=np.int64)
+        self.counts = np.zeros(16, dtype=np.int64)
+        dx, dy = NEIGHBOR_OFFSETS[:, 0], NEIGHBOR_OFFSETS[:, 1]
+        for border in range(16):
+            valid = ~(
+                ((border & 1) > 0) & (dx < 0)
+                | ((border & 2) > 0) & (dx > 0)
+                | ((border & 4) > 0) & (dy < 0)
+                | ((border & 8) > 0) & (dy > 0)
+            )
+            self.counts[border] = valid.sum()
+            self.offsets[border, : valid.sum()] = NEIGHBOR_OFFSETS[valid]
+
+    def borders(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        width, height = self.size
+        return (
+            (x == 0) * 1 + (x == width - 1) * 2 + (y == 0) * 4 + (y == height - 1) * 8
+        )
+
+    def sample(
+        self, x: np.ndarray, y: np.ndarray, uniforms: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        borders = self.borders(x, y)
+        choices = (uniforms * self.counts[borders]).astype(np.int64)
+        offsets = self.offsets[borders, choices]
+        return x + offsets[:, 0], y + offsets[:, 1]
+
+    def neighbor(self, point: Point, uniform: float) -> Point:
+        border = int(self.borders(point.x, point.y))
+        dx, dy = self.offsets[border, int(uniform * self.counts[border])].tolist()
+        return Point(point.x + dx, point.y + dy)
@@ -0,0 +1,189 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import groupby
+from os import cpu_count
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from asset_site import AssetSite
+from conflict import Conflict
+from individual import Individual, nursery
+from point import Point
+from population import Population
+from rng import SimulationRNG
+from world_helper import natural_solver
+
+
+EXECUTORS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+Solver = Callable[[List[Conflict], SimulationRNG], List[Conflict]]
+
+
+# A chunk travels as one block of population rows plus, per conflict, its
+# place, member count and site counts. Solutions come back as per conflict
+# layouts, where i >= 0 is row i of the block and i < 0 is newborn -i - 1,
+# so members that survive are written back in place rather than re-adopted
+Block = Tuple[Population, List[Point], List[int], List[List[int]]]
+Solved = Tuple[Population, List[List[int]], Population, List[List[int]]]
+
+
+def solve_chunk(solver: Solver, block: Block, seed: int) -> Solved:
+    rng = None if seed is None else SimulationRNG(seed)
+    population, places, sizes, sites = block
+    offsets = np.cumsum([0] + sizes).tolist()
+    conflicts = [
+        Conflict(
+            place,
+            [
+                Individual.from_population(population, index)
+                for index in range(start, stop)
+            ],
+            AssetSite(counts),
+        )
+        for place, start, stop, counts in zip(places, offsets, offsets[1:], sites)
+    ]
+    born: Dict[int, int] = {}
+    children, layouts, sites = [], [], []
+    for conflict in solver(conflicts, rng):
+        sites.append(conflict.assets.counts)
+        layout = []
+        for individual in conflict.individuals:
+            index = population.index_of(individual)
+            if index is None:
+                if id(individual) not in born:
+                    born[id(individual)] = -len(children) - 1
+                    children.append(individual)
+                index = born[id(individual)]
+            layout.append(index)
+        layouts.append(layout)
+    newborns = Population(dna_size=population.dna_size)
+    newborns.adopt_many(children, 0, 0)
+    return population, layouts, newborns, sites
+
+
+class ParallelSolver:
+    def __init__(
+        self,
+        solver: Solver = natural_solver,
+        workers: int = None,
+        executor: str = "process",
+        chunk_size: int = 256,
+    ) -> None:
+        if executor not in EXECUTORS:
+            raise RuntimeError(
+                f"unknown executor {executor}, expected one of {tuple(EXECUTORS)}"
+            )
+        self.solver = solver
+        self.workers = workers or cpu_count() or 1
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self._pool: Executor = None
+
+    def __call__(
+        self, conflicts: List[Conflict], rng: SimulationRNG = None
+    ) -> List[Conflict]:
+        chunks = self.chunk(conflicts)
+        if rng is None:
+            seeds = [None] * len(chunks)
+        else:
+            seeds = rng.integers(2**63 - 1, len(chunks)).tolist()
+        members = [ParallelSolver.members(chunk) for chunk in chunks]
+        blocks = [
+            ParallelSolver.pack(chunk, rows) for chunk, rows in zip(chunks, members)
+        ]
+        pool = self._get_pool()
+        solutions = []
+        for chunk, rows, solved in zip(
+            chunks,
+            members,
+            pool.map(solve_chunk, [self.solver] * len(chunks), blocks, seeds),
+        ):
+            solutions.extend(ParallelSolver.unpack(chunk, rows, solved))
+        return solutions
+
+    @staticmethod
+    def members(chunk: List[Conflict]) -> List[Tuple[Population, int]]:
+        return [
+            (individual._population, individual._index)
+            for conflict in chunk
+            for individual in conflict.individuals
+        ]
+
+    @staticmethod
+    def pack(chunk: List[Conflict], rows: List[Tuple[Population, int]]) -> Block:
+        block = None
+        for population, indices in ParallelSolver.runs(rows):
+            taken = population.take(indices)
+            if block is None:
+                block = taken
+            else:
+                block.append_columns(taken.columns)
+        if block is None:
+            block = Population()
+        return (
+            block,
+            [conflict.place for conflict in chunk],
+            [len(conflict.individuals) for conflict in chunk],
+            [conflict.assets.counts for conflict in chunk],
+        )
+
+    @staticmethod
+    def unpack(
+        chunk: List[Conflict], rows: List[Tuple[Population, int]], solved: Solved
+    ) -> List[Conflict]:
+        block, layouts, newborns, sites = solved
+        start = 0
+        for population, indices in ParallelSolver.runs(rows):
+            stop = start + len(indices)
+            population.assign_rows(indices, block, np.arange(start, stop))
+            start = stop
+        # newborns wait in the nursery like those born in this process
+        nursed = nursery()
+        born = nursed.append_columns(newborns.columns).tolist()
+        solutions = []
+        for conflict, layout, counts in zip(chunk, layouts, sites):
+            individuals = [
+                Individual.from_population(*rows[i])
+                if i >= 0
+                else Individual.from_population(nursed, born[-i - 1])
+                for i in layout
+            ]
+            solutions.append(Conflict(conflict.place, individuals, AssetSite(counts)))
+        return solutions
+
+    @staticmethod
+    def runs(rows: List[Tuple[Population, int]]) -> List[Tuple[Population, List[int]]]:
+        # consecutive members of one population travel as one take, and
+        # members usually all live in the world's, making the block one take
+        return [
+            (population, [index for _, index in run])
+            for population, run in groupby(rows, key=lambda row: row[0])
+        ]
+
+    def chunk(self, conflicts: List[Conflict]) -> List[List[Conflict]]:
+        chunks, current, weight = [], [], 0
+        for conflict in conflicts:
+            current.append(conflict)
+            weight += len(conflict.individuals)
+            if weight >= self.chunk_size:
+                chunks.append(current)
+                current, weight = [], 0
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = EXECUTORS[self.executor](max_workers=self.workers)
+        return self._pool
+
+    def __enter__(self) -> "ParallelSolver":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
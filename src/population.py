@@ -0,0 +1,475 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from weakref import WeakValueDictionary
+
+import numpy as np
+
+from asset import ASSET_NUM
+from constants import DNA_BASES, DNA_SIZE
+from dna_helper import DNA_PAD
+from shared_state import SharedAllocator, Spec
+
+
+class Population:
+    def __init__(
+        self,
+        capacity: int = 0,
+        dna_size: int = DNA_SIZE,
+        allocator: Optional[SharedAllocator] = None,
+    ) -> None:
+        self.dna_size = dna_size
+        self.version = 0
+        self._size = 0
+        self._allocator = allocator
+        self._columns = {
+            "x": self._allocate((capacity,), np.int64),
+            "y": self._allocate((capacity,), np.int64),
+            "age": self._allocate((capacity,), np.int64),
+            "influence": self._allocate((capacity,), np.float64),
+            "starving_days": self._allocate((capacity,), np.int64),
+            "preferences": self._allocate((capacity, ASSET_NUM), np.float64),
+            "dna": self._allocate((capacity, dna_size), np.uint8, DNA_PAD),
+            "assets": self._allocate((capacity, ASSET_NUM), np.int64),
+            "happiness": self._allocate((capacity,), np.float64),
+            "bases": self._allocate((capacity, len(DNA_BASES)), np.uint16),
+        }
+        self._age_total = 0
+        self._assets_total = np.zeros(ASSET_NUM, dtype=np.int64)
+        self._happiness_total = 0.0
+        self._bases_total = np.zeros(len(DNA_BASES), dtype=np.int64)
+        self._views = WeakValueDictionary()
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._readonly("x")
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._readonly("y")
+
+    @property
+    def age(self) -> np.ndarray:
+        return self._readonly("age")
+
+    @property
+    def influence(self) -> np.ndarray:
+        return self._columns["influence"][: self._size]
+
+    @property
+    def starving_days(self) -> np.ndarray:
+        return self._columns["starving_days"][: self._size]
+
+    @property
+    def preferences(self) -> np.ndarray:
+        return self._readonly("preferences")
+
+    @property
+    def dna(self) -> np.ndarray:
+        return self._readonly("dna")
+
+    @property
+    def assets(self) -> np.ndarray:
+        return self._readonly("assets")
+
+    @property
+    def happiness(self) -> np.ndarray:
+        return self._readonly("happiness")
+
+    @property
+    def bases(self) -> np.ndarray:
+        return self._readonly("bases")
+
+    @property
+    def age_total(self) -> int:
+        return self._age_total
+
+    @property
+    def assets_total(self) -> np.ndarray:
+        return self._assets_total.copy()
+
+    @property
+    def happiness_total(self) -> float:
+        return self._happiness_total
+
+    @property
+    def bases_mean(self) -> np.ndarray:
+        return self._bases_total / max(self._size, 1)
+
+    @property
+    def shared(self) -> bool:
+        return self._allocator is not None
+
+    def shared_spec(self) -> Dict[str, Spec]:
+        if self._allocator is None:
+            raise RuntimeError("population is not kept in shared memory")
+        return {
+            name: self._allocator.spec(column) for name, column in self._columns.items()
+        }
+
+    def recount(self) -> None:
+        columns = self._columns
+        rows = slice(0, self._size)
+        columns["happiness"][rows] = np.sum(
+            columns["preferences"][rows] * columns["assets"][rows], axis=1
+        )
+        self._age_total = 0
+        self._assets_total = np.zeros(ASSET_NUM, dtype=np.int64)
+        self._happiness_total = 0.0
+        self._bases_total = np.zeros(len(DNA_BASES), dtype=np.int64)
+        self._account(rows, 1)
+        self.version += 1
+
+    def restore_totals(self, age_total: int, happiness_total: float) -> None:
+        # totals kept by a saved run differ from a fresh sum in the last
+        # float bits, so a resumed run carries them over as they were
+        self._age_total = age_total
+        self._happiness_total = happiness_total
+
+    def dna_distances(self) -> np.ndarray:
+        return Population.distances(self.bases, self._bases_total, self._size)
+
+    @staticmethod
+    def distances(bases: np.ndarray, totals: np.ndarray, size: int) -> np.ndarray:
+        # sum((mean - bases) ** 2) expanded over the integer totals, so a
+        # distance is zero exactly when an individual matches the mean
+        bases = bases.astype(np.int64)
+        numerator = (
+            size * size * (bases * bases).sum(axis=1)
+            - 2 * size * (bases @ totals)
+            + totals @ totals
+        )
+        return numerator / float(max(size, 1) ** 2)
+
+    def set_dna(self, index: int, dna: Sequence[int]) -> None:
+        if len(dna) > self.dna_size:
+            raise RuntimeError(
+                f"DNA of length {len(dna)} does not fit in {self.dna_size} bases"
+            )
+        columns = self._columns
+        codes = columns["dna"][index]
+        codes[:] = DNA_PAD
+        codes[: len(dna)] = dna
+        bases = np.bincount(codes[codes != DNA_PAD], minlength=len(DNA_BASES))
+        self._bases_total += bases - columns["bases"][index]
+        columns["bases"][index] = bases
+
+    def set_age(self, indices: Any, age: Any) -> None:
+        column = self._columns["age"][: self._size]
+        self._age_total += int(np.sum(age - column[indices]))
+        column[indices] = age
+
+    def set_preferences(self, indices: Any, preferences: Any) -> None:
+        rows = Population._rows(indices)
+        column = self._columns["preferences"][: self._size]
+        column[indices] = preferences
+        self._update_happiness(rows)
+
+    def set_assets(self, indices: Any, assets: Any) -> None:
+        rows = Population._rows(indices)
+        column = self._columns["assets"][: self._size]
+        before = column[rows].copy()
+        column[indices] = assets
+        delta = column[rows] - before
+        self._assets_total += np.reshape(delta, (-1, ASSET_NUM)).sum(axis=0)
+        self._update_happiness(rows)
+
+    def change_assets(self, indices: Any, delta: Any) -> None:
+        self.set_assets(indices, self.assets[indices] + delta)
+
+    # scalar counterparts of the setters above for the object paths, which
+    # touch one individual at a time: plain element writes and Python
+    # arithmetic on the totals, without fancy indexing or reductions
+    def value(self, name: str, index: Any) -> Any:
+        return self._columns[name].item(index)
+
+    def row(self, name: str, index: int) -> list:
+        return self._columns[name][index].tolist()
+
+    def set_row_age(self, index: int, age: int) -> None:
+        column = self._columns["age"]
+        self._age_total += age - column.item(index)
+        column[index] = age
+
+    def set_row_assets(self, index: int, counts: Sequence[int]) -> None:
+        column, totals = self._columns["assets"], self._assets_total
+        for i, (count, before) in enumerate(zip(counts, column[index].tolist())):
+            if count != before:
+                column[index, i] = count
+                totals[i] = totals.item(i) + count - before
+        self._set_row_happiness(index, counts)
+
+    def change_row_assets(self, index: int, delta: Sequence[int]) -> None:
+        counts = self._columns["assets"][index].tolist()
+        self.set_row_assets(index, [c + d for c, d in zip(counts, delta)])
+
+    def change_cell_asset(self, index: int, asset: int, delta: int) -> None:
+        column, totals = self._columns["assets"], self._assets_total
+        column[index, asset] = column.item(index, asset) + delta
+        totals[asset] = totals.item(asset) + delta
+        self._set_row_happiness(index, column[index].tolist())
+
+    def add(
+        self,
+        dna: Sequence[int],
+        preferences: Sequence[float],
+        x: int = 0,
+        y: int = 0,
+        age: int = 0,
+        influence: float = 0.0,
+        starving_days: int = 0,
+        assets: Optional[Sequence[int]] = None,
+    ) -> int:
+        if len(dna) > self.dna_size:
+            raise RuntimeError(
+                f"DNA of length {len(dna)} does not fit in {self.dna_size} bases"
+            )
+        index = self._size
+        self._reserve(index + 1)
+        self._size += 1
+        columns = self._columns
+        counts = [0] * ASSET_NUM if assets is None else list(assets)
+        columns["x"][index] = x
+        columns["y"][index] = y
+        columns["age"][index] = age
+        columns["influence"][index] = influence
+        columns["starving_days"][index] = starving_days
+        columns["preferences"][index] = preferences
+        columns["assets"][index] = counts
+        columns["happiness"][index] = 0.0
+        columns["bases"][index] = 0
+        # one row is accounted with scalar arithmetic, as in the row setters
+        self._age_total += age
+        totals = self._assets_total
+        for i, count in enumerate(counts):
+            totals[i] = totals.item(i) + count
+        self._set_row_happiness(index, counts)
+        self.set_dna(index, dna)
+        self.version += 1
+        return index
+
+    def add_many(
+        self, dna: np.ndarray, preferences: np.ndarray, x: np.ndarray, y: np.ndarray
+    ) -> np.ndarray:
+        if dna.shape[1] > self.dna_size:
+            raise RuntimeError(
+                f"DNA of length {dna.shape[1]} does not fit in {self.dna_size} bases"
+            )
+        start = self._size
+        self._reserve(start + len(dna))
+        self._size += len(dna)
+        rows = slice(start, self._size)
+        for name, column in self._columns.items():
+            column[rows] = 0
+        columns = self._columns
+        columns["x"][rows] = x
+        columns["y"][rows] = y
+        columns["preferences"][rows] = preferences
+        columns["dna"][rows] = DNA_PAD
+        columns["dna"][rows, : dna.shape[1]] = dna
+        columns["bases"][rows] = Population._histogram(columns["dna"][rows])
+        self._account(rows, 1)
+        self.version += 1
+        return np.arange(start, self._size)
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: self._readonly(name) for name in self._columns}
+
+    def append_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        size = len(columns["x"])
+        if columns["dna"].shape[1] != self.dna_size:
+            raise RuntimeError(
+                f"cannot mix DNA sizes {columns['dna'].shape[1]} and {self.dna_size}"
+            )
+        start = self._size
+        self._reserve(start + size)
+        self._size += size
+        for name, column in self._columns.items():
+            column[start : self._size] = columns[name]
+        self._account(slice(start, self._size), 1)
+        self.version += 1
+        return np.arange(start, self._size)
+
+    def assign_rows(
+        self, indices: Iterable[int], other: "Population", other_indices: Iterable[int]
+    ) -> None:
+        # overwrites rows in place with rows of another population, e.g. rows
+        # that were solved elsewhere, keeping every view and position valid
+        indices = np.asarray(indices, dtype=np.int64)
+        self._account(indices, -1)
+        for name, column in self._columns.items():
+            column[: self._size][indices] = other._columns[name][other_indices]
+        self._account(indices, 1)
+
+    def take(self, indices: Iterable[int]) -> "Population":
+        indices = np.asarray(indices, dtype=np.int64)
+        population = Population(capacity=len(indices), dna_size=self.dna_size)
+        population._append_rows(self, indices)
+        return population
+
+    def remove(self, indices: Iterable[int]) -> None:
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return
+        keep = np.ones(self._size, dtype=bool)
+        keep[indices] = False
+        new_indices = np.cumsum(keep) - 1
+        views = list(self._views.items())
+        rows = np.array([index for index, _ in views], dtype=np.int64)
+
+        orphans = np.flatnonzero(~keep[rows])
+        if len(orphans):
+            detached = self.take(rows[orphans])
+            for new_index, orphan in enumerate(orphans.tolist()):
+                index, view = views[orphan]
+                del self._views[index]
+                detached.bind_view(view, new_index)
+
+        self._account(~keep, -1)
+        size = int(keep.sum())
+        for name, column in self._columns.items():
+            column[:size] = column[: self._size][keep]
+        self._size = size
+
+        # only views below the first removed row keep their index, the rest
+        # are re-bound in ascending order so no live key is overwritten
+        moved = np.flatnonzero(keep[rows] & (new_indices[rows] != rows))
+        moved = moved[np.argsort(rows[moved], kind="stable")]
+        for position, index in zip(moved.tolist(), new_indices[rows[moved]].tolist()):
+            old_index, view = views[position]
+            del self._views[old_index]
+            self.bind_view(view, index)
+        self.version += 1
+
+    def move(self, indices: Any, x: Any, y: Any) -> None:
+        self._columns["x"][: self._size][indices] = x
+        self._columns["y"][: self._size][indices] = y
+        self.version += 1
+
+    def adopt(self, view: Any, x: int, y: int) -> int:
+        return int(self.adopt_many([view], x, y)[0])
+
+    def adopt_many(self, views: Sequence[Any], x: Any, y: Any) -> np.ndarray:
+        # views of other populations, e.g. newborns sharing a nursery, are
+        # copied with one append per source and removed from it in one go
+        indices = np.zeros(len(views), dtype=np.int64)
+        sources: Dict[int, List[int]] = {}
+        for position, view in enumerate(views):
+            sources.setdefault(id(view._population), []).append(position)
+        for positions in sources.values():
+            source = views[positions[0]]._population
+            rows = [views[position]._index for position in positions]
+            indices[positions] = self._append_rows(source, rows)
+            for position, row in zip(positions, rows):
+                source._views.pop(row, None)
+                self.bind_view(views[position], int(indices[position]))
+            source.remove(rows)
+        self.move(indices, x, y)
+        return indices
+
+    def prune(self, slack: int = 0) -> None:
+        # drops the rows no view refers to any more, once there are more
+        # than slack of them
+        if self._size - len(self._views) <= slack:
+            return
+        keep = np.zeros(self._size, dtype=bool)
+        keep[list(self._views.keys())] = True
+        self.remove(np.flatnonzero(~keep))
+
+    def index_of(self, view: Any) -> Optional[int]:
+        if view._population is self:
+            return view._index
+        return None
+
+    def get_view(self, index: int) -> Optional[Any]:
+        return self._views.get(index)
+
+    def bind_view(self, view: Any, index: int) -> None:
+        view._population = self
+        view._index = index
+        self._views[index] = view
+
+    def _append_rows(self, other: "Population", indices: Iterable[int]) -> np.ndarray:
+        indices = np.asarray(indices, dtype=np.int64)
+        return self.append_columns(
+            {name: column[indices] for name, column in other._columns.items()}
+        )
+
+    def _account(self, rows: Any, sign: int) -> None:
+        columns = self._columns
+        assets = columns["assets"][: self._size][rows]
+        happiness = columns["happiness"][: self._size][rows]
+        self._age_total += sign * int(columns["age"][: self._size][rows].sum())
+        self._assets_total += sign * assets.sum(axis=0)
+        self._happiness_total += sign * float(happiness.sum())
+        self._bases_total += sign * columns["bases"][: self._size][rows].sum(
+            axis=0, dtype=np.int64
+        )
+
+    def _update_happiness(self, rows: Any) -> None:
+        column = self._columns["happiness"][: self._size]
+        before = column[rows].copy()
+        column[rows] = np.sum(self.preferences[rows] * self.assets[rows], axis=-1)
+        self._happiness_total += float(np.sum(column[rows] - before))
+
+    def _set_row_happiness(self, index: int, counts: Sequence[int]) -> None:
+        # summed in the same order as the vectorized np.sum over a row
+        happiness = 0.0
+        preferences = self._columns["preferences"][index].tolist()
+        for preference, count in zip(preferences, counts):
+            happiness += preference * count
+        column = self._columns["happiness"]
+        self._happiness_total += happiness - column.item(index)
+        column[index] = happiness
+
+    @staticmethod
+    def _rows(indices: Any) -> Any:
+        # indices address whole rows or single (row, column) cells and are
+        # expected to be unique, as with numpy fancy assignment
+        return indices[0] if isinstance(indices, tuple) else indices
+
+    def _readonly(self, name: str) -> np.ndarray:
+        column = self._columns[name][: self._size]
+        column.flags.writeable = False
+        return column
+
+    @staticmethod
+    def _histogram(dna: np.ndarray) -> np.ndarray:
+        rows = np.repeat(np.arange(len(dna)), dna.shape[1])
+        codes = dna.ravel()
+        present = codes != DNA_PAD
+        return np.bincount(
+            rows[present] * len(DNA_BASES) + codes[present],
+            minlength=len(dna) * len(DNA_BASES),
+        ).reshape(len(dna), len(DNA_BASES))
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._columns["x"])
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name, column in self._columns.items():
+            grown = self._allocate((capacity,) + column.shape[1:], column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+            if self._allocator is not None:
+                self._allocator.release(column)
+
+    def _allocate(self, shape: tuple, dtype: Any, fill: int = 0) -> np.ndarray:
+        if self._allocator is None:
+            return np.full(shape, fill, dtype=dtype)
+        column = self._allocator.empty(shape, dtype)
+        column[...] = fill
+        return column
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_views"] = None
+        state["_allocator"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._views = WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return self._size
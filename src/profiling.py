@@ -0,0 +1,124 @@
+import cProfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# per-tick durations are binned by their power of two in nanoseconds
+HISTOGRAM_BUCKETS = 64
+TICK_PHASES = ("get_conflicts", "solve_conflicts", "solve_batch", "move_time")
+ENGINE_PHASES = {
+    "object": (
+        "_collect_assets",
+        "_regenerate_assets",
+        "_age_individuals",
+        "_update_influences",
+        "_move_individuals",
+    ),
+    "vectorized": (
+        "collect_assets",
+        "regenerate_assets",
+        "age_individuals",
+        "update_influences",
+        "move_individuals",
+    ),
+    "tiled": ("send_states", "merge"),
+}
+
+
+@dataclass
+class PhaseStats:
+    ticks: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.ticks if self.ticks else 0.0
+
+
+class TickProfiler:
+    # phases are timed by shadowing the bound methods of one world, so a
+    # world without a profiler runs exactly the code it always did
+    def __init__(
+        self, profile_tick: Optional[int] = None, profile_path: str = "tick.prof"
+    ) -> None:
+        self.profile_tick = profile_tick
+        self.profile_path = profile_path
+        self.world = None
+        self._stats: Dict[str, PhaseStats] = defaultdict(PhaseStats)
+        self._histograms: Dict[str, np.ndarray] = defaultdict(
+            lambda: np.zeros(HISTOGRAM_BUCKETS, dtype=np.int64)
+        )
+        self._current: Dict[str, int] = defaultdict(int)
+        self._shadowed: List[Tuple[Any, str]] = []
+        self._profile: Optional[cProfile.Profile] = None
+
+    def attach(self, world: Any) -> None:
+        if self.world is not None:
+            raise RuntimeError("profiler is already attached to a world")
+        self.world = world
+        for name in TICK_PHASES:
+            self._shadow(world, name, top_level=True)
+        target = world if world._engine is None else world._engine
+        for name in ENGINE_PHASES[world.engine]:
+            self._shadow(target, name, top_level=False)
+
+    def detach(self) -> None:
+        for target, name in self._shadowed:
+            delattr(target, name)
+        self._shadowed = []
+        self.world = None
+
+    def stats(self) -> Dict[str, PhaseStats]:
+        return dict(self._stats)
+
+    def histogram(self, phase: str) -> Tuple[np.ndarray, np.ndarray]:
+        edges = 2.0 ** np.arange(HISTOGRAM_BUCKETS + 1) / 1e9
+        return edges, self._histograms[phase].copy()
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._histograms.clear()
+        self._current.clear()
+
+    def _shadow(self, target: Any, name: str, top_level: bool) -> None:
+        step = getattr(target, name)
+        phase = name.lstrip("_")
+
+        def run(*args, **kwargs):
+            profiling = top_level and self.world.tick == self.profile_tick
+            if profiling:
+                self._profile = self._profile or cProfile.Profile()
+                self._profile.enable()
+            start = time.perf_counter_ns()
+            try:
+                return step(*args, **kwargs)
+            finally:
+                self._current[phase] += time.perf_counter_ns() - start
+                if profiling:
+                    self._profile.disable()
+                if name == "move_time":
+                    self._close_tick(profiling)
+
+        setattr(target, name, run)
+        self._shadowed.append((target, name))
+
+    def _close_tick(self, profiling: bool) -> None:
+        for phase, elapsed in self._current.items():
+            seconds = elapsed / 1e9
+            stats = self._stats[phase]
+            stats.ticks += 1
+            stats.total += seconds
+            stats.min = min(stats.min, seconds)
+            stats.max = max(stats.max, seconds)
+            bucket = min(max(elapsed, 1).bit_length() - 1, HISTOGRAM_BUCKETS - 1)
+            self._histograms[phase][bucket] += 1
+        self._current.clear()
+        if profiling:
+            self._profile.dump_stats(self.profile_path)
+            self._profile = None
@@ -0,0 +1,56 @@
+import random
+from typing import Any, Dict, List, MutableSequence, Sequence, TypeVar
+
+import numpy as np
+
+
+BLOCK_SIZE = 4096
+
+T = TypeVar("T")
+
+
+class SimulationRNG:
+    def __init__(self, seed: int = None, block_size: int = BLOCK_SIZE) -> None:
+        self.seed = seed
+        self.block_size = block_size
+        self.generator = np.random.default_rng(seed)
+        self._uniforms: List[float] = []
+
+    def random(self) -> float:
+        if not self._uniforms:
+            self._uniforms = self.generator.random(self.block_size).tolist()
+        return self._uniforms.pop()
+
+    def choices(self, items: Sequence[T], k: int) -> List[T]:
+        return [items[i] for i in self.integers(len(items), k).tolist()]
+
+    def sample(self, items: Sequence[T], k: int) -> List[T]:
+        indices = self.generator.choice(len(items), size=k, replace=False)
+        return [items[i] for i in indices.tolist()]
+
+    def shuffle(self, items: MutableSequence[T]) -> None:
+        items[:] = [items[i] for i in self.generator.permutation(len(items)).tolist()]
+
+    def uniforms(self, n: int) -> np.ndarray:
+        return self.generator.random(n)
+
+    def integers(self, high: int, n: int) -> np.ndarray:
+        return self.generator.integers(0, high, n)
+
+    def get_state(self) -> Dict[str, Any]:
+        # the buffered draws are part of the state, or a resumed run would
+        # not draw the same numbers as the original one
+        return {
+            "bit_generator": self.generator.bit_generator.state,
+            "uniforms": list(self._uniforms),
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.generator.bit_generator.state = state["bit_generator"]
+        self._uniforms = list(state["uniforms"])
+
+
+# callers that pass no rng draw from the random module, array draws included,
+# so that random.seed() alone makes them reproducible
+def fallback_generator() -> np.random.Generator:
+    return np.random.default_rng(random.getrandbits(64))
@@ -0,0 +1,83 @@
+import mmap
+import os
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+# segments are mapped through their file in the shared memory filesystem, so
+# attaching never registers them with the resource tracker of the attacher
+SHM_DIR = "/dev/shm"
+
+Spec = Tuple[str, Tuple[int, ...], str]
+
+
+class SharedAllocator:
+    def __init__(self) -> None:
+        if not os.path.isdir(SHM_DIR):
+            raise RuntimeError(f"shared worlds need a shared memory mount at {SHM_DIR}")
+        self._segments: Dict[int, Tuple[weakref.ref, SharedMemory]] = {}
+
+    def empty(self, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        segment = SharedMemory(create=True, size=size)
+        # the array keeps its own mapping, the segment is only kept to unlink it
+        segment.close()
+        array = _map(segment.name, shape, dtype)
+        self._segments[id(array)] = (weakref.ref(array), segment)
+        return array
+
+    def spec(self, array: np.ndarray) -> Spec:
+        reference, segment = self._segments.get(id(array), (None, None))
+        if reference is None or reference() is not array:
+            raise RuntimeError("array was not allocated in shared memory")
+        return segment.name, array.shape, array.dtype.str
+
+    def release(self, array: np.ndarray) -> None:
+        _, segment = self._segments.pop(id(array))
+        _unlink(segment)
+
+    def close(self) -> None:
+        for _, segment in self._segments.values():
+            _unlink(segment)
+        self._segments = {}
+
+
+class SharedAttachments:
+    def __init__(self) -> None:
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def attach(self, spec: Spec) -> np.ndarray:
+        name, shape, dtype = spec
+        array = self._arrays.get(name)
+        if array is None or array.shape != tuple(shape):
+            array = _map(name, shape, np.dtype(dtype))
+            self._arrays[name] = array
+        return array
+
+    def attach_all(self, specs: Dict[str, Spec]) -> Dict[str, np.ndarray]:
+        names = {spec[0] for spec in specs.values()}
+        self._arrays = {n: a for n, a in self._arrays.items() if n in names}
+        return {key: self.attach(spec) for key, spec in specs.items()}
+
+    def close(self) -> None:
+        self._arrays = {}
+
+
+def _map(name: str, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    # the array's buffer export keeps the mapping open for as long as any view
+    # of it exists, even once the segment has been unlinked
+    count = int(np.prod(shape))
+    with open(os.path.join(SHM_DIR, name.lstrip("/")), "r+b") as f:
+        mapping = mmap.mmap(f.fileno(), max(count * dtype.itemsize, 1))
+    return np.frombuffer(mapping, dtype=dtype, count=count).reshape(shape)
+
+
+def _unlink(segment: SharedMemory) -> None:
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
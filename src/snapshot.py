@@ -0,0 +1,139 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from world import World
+
+
+MAGIC = b"WSIMSNAP"
+FORMAT_VERSION = 3
+ALIGNMENT = 64
+# magic, then format version and header length as little endian uint64
+PREAMBLE_SIZE = len(MAGIC) + 16
+
+
+@dataclass
+class Snapshot:
+    meta: Dict[str, Any]
+    arrays: Dict[str, np.ndarray]
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return tuple(self.meta["size"])
+
+    @property
+    def tick(self) -> int:
+        return self.meta["tick"]
+
+
+def save_snapshot(world: World, path: str) -> None:
+    # the world is written next to the target and renamed over it, so a crash
+    # mid-checkpoint never leaves a truncated snapshot behind
+    rng_state = world.rng.get_state()
+    cells, counts = world.site_positions.occupied()
+    arrays = dict(world.population.columns)
+    arrays["cells"] = cells
+    arrays["counts"] = counts
+    arrays["rng_uniforms"] = np.array(rng_state["uniforms"], dtype=np.float64)
+    meta = {
+        "size": list(world.size),
+        "tick": world.tick,
+        "engine": world.engine,
+        "tiles": list(getattr(world._engine, "tiles", (2, 2))),
+        "sparse": world.sparse,
+        "seed": world.rng.seed,
+        "initial_individuals": world.initial_individuals,
+        "initial_populations": world.initial_populations,
+        "initial_assets": world.initial_assets,
+        "age_total": world.population.age_total,
+        "happiness_total": world.population.happiness_total,
+        "rng": {"bit_generator": rng_state["bit_generator"]},
+        "arrays": {},
+    }
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        meta["arrays"][name] = [array.dtype.str, list(array.shape), offset]
+        offset = _align(offset + array.nbytes)
+    header = json.dumps(meta).encode()
+
+    partial = f"{path}.partial"
+    with open(partial, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([FORMAT_VERSION, len(header)], dtype="<u8").tobytes())
+        f.write(header)
+        start = _align(PREAMBLE_SIZE + len(header))
+        f.write(bytes(start - f.tell()))
+        for name, array in arrays.items():
+            f.write(bytes(start + meta["arrays"][name][2] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(partial, path)
+
+
+def read_snapshot(path: str) -> Snapshot:
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise RuntimeError(f"{path} is not a world snapshot")
+    version, length = np.frombuffer(data[len(MAGIC) : PREAMBLE_SIZE], dtype="<u8")
+    if version != FORMAT_VERSION:
+        raise RuntimeError(
+            f"snapshot format {version} is not supported, expected {FORMAT_VERSION}"
+        )
+    meta = json.loads(bytes(data[PREAMBLE_SIZE : PREAMBLE_SIZE + int(length)]))
+    start = _align(PREAMBLE_SIZE + int(length))
+    arrays = {}
+    for name, (dtype, shape, offset) in meta["arrays"].items():
+        dtype = np.dtype(dtype)
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        arrays[name] = (
+            data[start + offset : start + offset + nbytes].view(dtype).reshape(shape)
+        )
+    return Snapshot(meta, arrays)
+
+
+def load_snapshot(
+    path: str,
+    engine: Optional[str] = None,
+    tiles: Optional[Tuple[int, int]] = None,
+    debug: bool = False,
+    shared: bool = False,
+) -> World:
+    snapshot = read_snapshot(path)
+    meta, arrays = snapshot.meta, snapshot.arrays
+    world = World(
+        size=snapshot.size,
+        initial_individuals=0,
+        initial_populations=0,
+        initial_assets=0,
+        engine=meta["engine"] if engine is None else engine,
+        debug=debug,
+        seed=meta["seed"],
+        tiles=tuple(meta["tiles"]) if tiles is None else tiles,
+        shared=shared,
+        sparse=meta["sparse"],
+    )
+    world.initial_individuals = meta["initial_individuals"]
+    world.initial_populations = meta["initial_populations"]
+    world.initial_assets = meta["initial_assets"]
+    world.tick = meta["tick"]
+
+    population = world.population
+    population.append_columns({name: arrays[name] for name in population.columns})
+    population.restore_totals(meta["age_total"], meta["happiness_total"])
+    world.site_positions.add(arrays["cells"], arrays["counts"])
+
+    world.rng.set_state(
+        {
+            "bit_generator": meta["rng"]["bit_generator"],
+            "uniforms": arrays["rng_uniforms"].tolist(),
+        }
+    )
+    return world
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
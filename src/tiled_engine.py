@@ -0,0 +1,284 @@
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from asset import ASSET_NUM
+from constants import (
+    ASSET_MAX_FOR_TYPE_IN_POINT,
+    DNA_BASES,
+)
+from engine import (
+    deaths,
+    EDIBLE,
+    GROWABLE,
+    influences,
+    reproduce,
+    settle_offspring,
+)
+from neighbors import NeighborTable
+from population import Population
+from shared_state import SharedAttachments
+
+
+COLUMNS = ("x", "y", "age", "starving_days", "preferences", "assets", "bases")
+
+Bounds = Tuple[int, int, int, int]
+
+
+class Tile:
+    def __init__(self, bounds: Bounds, size: Tuple[int, int]) -> None:
+        self.bounds = bounds
+        self.size = size
+        self.shape = (bounds[1] - bounds[0], bounds[3] - bounds[2])
+        self.neighbors = NeighborTable(size)
+        self.attachments = SharedAttachments()
+
+    def run_local(self, state: Dict[str, np.ndarray], seed: int) -> Tuple:
+        self.state = state
+        self.counts = state.pop("counts").reshape(-1, ASSET_NUM)
+        self.rng = np.random.default_rng(seed)
+        self.collect_assets()
+        self.regenerate_assets()
+        self.age_individuals()
+        state = self.state
+        wealth = int(state["assets"].sum()) + int(self.counts.sum())
+        bases_total = state["bases"].sum(axis=0, dtype=np.int64)
+        return len(state["x"]), bases_total, wealth
+
+    def run_global(self, bases_total: np.ndarray, size: int, wealth: float) -> Dict:
+        state = self.state
+        state["influence"] = influences(
+            Population.distances(state["bases"], bases_total, size),
+            state["age"],
+            state["assets"].sum(axis=1),
+            wealth,
+        )
+        state["x"], state["y"] = self.neighbors.sample(
+            state["x"], state["y"], self.rng.random(len(state["x"]))
+        )
+        del state["bases"], state["preferences"]
+        state["counts"] = self.counts.reshape(self.shape + (ASSET_NUM,))
+        state["outgoing"] = self.outgoing
+        self.state = None
+        return state
+
+    def run_local_shared(self, spec: Dict, seed: int) -> Tuple:
+        x0, x1, y0, y1 = self.bounds
+        arrays = self.arrays = self.attachments.attach_all(spec["arrays"])
+        x, y = arrays["x"][: spec["size"]], arrays["y"][: spec["size"]]
+        indices = np.flatnonzero((x0 <= x) & (x < x1) & (y0 <= y) & (y < y1))
+        state = {name: arrays[name][indices] for name in COLUMNS}
+        state["indices"] = indices
+        state["counts"] = arrays["counts"][x0:x1, y0:y1]
+        return self.run_local(state, seed)
+
+    def run_global_shared(
+        self, bases_total: np.ndarray, size: int, wealth: float
+    ) -> Dict:
+        x0, x1, y0, y1 = self.bounds
+        state = self.run_global(bases_total, size, wealth)
+        arrays, indices = self.arrays, state["indices"]
+        for name in ("x", "y", "age", "starving_days", "assets", "influence"):
+            arrays[name][indices] = state[name]
+        arrays["counts"][x0:x1, y0:y1] = state["counts"]
+        self.arrays = None
+        return {"dead": state["dead"], "outgoing": state["outgoing"]}
+
+    def collect_assets(self) -> None:
+        state, counts = self.state, self.counts
+        cells = self.local_cells(state["x"], state["y"])
+        occupancy = np.bincount(cells, minlength=len(counts))
+        solo = np.flatnonzero(occupancy[cells] == 1)
+        solo_cells = cells[solo]
+        taken = self.rng.binomial(counts[solo_cells], state["preferences"][solo])
+        state["assets"][solo] += taken
+        counts[solo_cells] -= taken.astype(counts.dtype)
+
+    def regenerate_assets(self) -> None:
+        x0, x1, y0, y1 = self.bounds
+        counts = self.counts
+        cells = self.local_cells(self.state["x"], self.state["y"])
+        occupancy = np.bincount(cells, minlength=len(counts))
+        free = np.flatnonzero(occupancy == 0)
+        sources, kinds = reproduce(free, counts[free][:, GROWABLE], self.rng)
+        x, y = np.divmod(sources, self.shape[1])
+        x, y = self.neighbors.sample(x + x0, y + y0, self.rng.random(len(sources)))
+        inside = (x0 <= x) & (x < x1) & (y0 <= y) & (y < y1)
+
+        targets, deltas = settle_offspring(
+            self.local_cells(x[inside], y[inside]), kinds[inside], counts.__getitem__
+        )
+        np.add.at(counts, targets, deltas.astype(counts.dtype))
+
+        keys, offspring = np.unique(
+            (x[~inside] * self.size[1] + y[~inside]) * ASSET_NUM + kinds[~inside],
+            return_counts=True,
+        )
+        self.outgoing = np.stack([keys, offspring])
+
+    def age_individuals(self) -> None:
+        state = self.state
+        starving_days = state["starving_days"]
+        state["age"] += 1
+        has_food = state["assets"][:, EDIBLE] > 0
+        state["assets"][has_food, EDIBLE] -= 1
+        starving_days[has_food] = 0
+        starving_days[~has_food] += 1
+
+        dead = deaths(state["age"], starving_days, self.rng.random(len(has_food)))
+        cells = self.local_cells(state["x"][dead], state["y"][dead])
+        np.add.at(self.counts, cells, state["assets"][dead].astype(self.counts.dtype))
+        state["dead"] = state["indices"][dead]
+        for name in ("indices",) + COLUMNS:
+            state[name] = state[name][~dead]
+
+    def local_cells(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return (x - self.bounds[0]) * self.shape[1] + (y - self.bounds[2])
+
+
+def serve(connection: Connection, bounds: Bounds, size: Tuple[int, int]) -> None:
+    tile = Tile(bounds, size)
+    while True:
+        message = connection.recv()
+        if message is None:
+            tile.attachments.close()
+            break
+        method, args = message
+        connection.send(getattr(tile, method)(*args))
+    connection.close()
+
+
+class TiledEngine:
+    def __init__(self, world: "World", tiles: Tuple[int, int] = (2, 2)) -> None:
+        width, height = world.size
+        if not (0 < tiles[0] <= width and 0 < tiles[1] <= height):
+            raise RuntimeError(f"cannot split grid {width}x{height} in {tiles} tiles")
+        self.world = world
+        self.tiles = tiles
+        self.x_edges = np.linspace(0, width, tiles[0] + 1).astype(np.int64)
+        self.y_edges = np.linspace(0, height, tiles[1] + 1).astype(np.int64)
+        self.bounds: List[Bounds] = [
+            (int(x0), int(x1), int(y0), int(y1))
+            for x0, x1 in zip(self.x_edges[:-1], self.x_edges[1:])
+            for y0, y1 in zip(self.y_edges[:-1], self.y_edges[1:])
+        ]
+        self._connections: List[Connection] = []
+        self._processes = []
+
+    def move_time(self) -> None:
+        self.start()
+        world = self.world
+        seeds = world.rng.integers(2**63 - 1, len(self.bounds)).tolist()
+        if world.shared:
+            # workers attach to the world's segments and pick their own rows,
+            # only names, seeds and the per-tick reductions cross the pipes
+            spec = world.shared_spec()
+            for connection, seed in zip(self._connections, seeds):
+                connection.send(("run_local_shared", (spec, seed)))
+        else:
+            self.send_states(seeds)
+
+        # wealth is reduced before the offspring that crossed a tile border
+        # land in merge, so unlike the vectorized engine it leaves them out
+        size, bases_total, wealth = 0, np.zeros(len(DNA_BASES), dtype=np.int64), 0
+        for connection in self._connections:
+            tile_size, tile_bases, tile_wealth = connection.recv()
+            size += tile_size
+            bases_total = bases_total + tile_bases
+            wealth += tile_wealth
+
+        method = "run_global_shared" if world.shared else "run_global"
+        for connection in self._connections:
+            connection.send((method, (bases_total, size, float(wealth))))
+        results = [connection.recv() for connection in self._connections]
+        self.merge(results)
+
+    def send_states(self, seeds: List[int]) -> None:
+        # without shared memory the parent still owns every agent, and each
+        # tick pickles all of them out to the tiles and back
+        population, grid = self.world.population, self.world.site_positions
+        owners = self.owners(population.x, population.y)
+        order = np.argsort(owners, kind="stable")
+        sizes = np.bincount(owners, minlength=len(self.bounds))
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        for tile, (connection, bounds) in enumerate(
+            zip(self._connections, self.bounds)
+        ):
+            indices = order[starts[tile] : ends[tile]]
+            state = {name: getattr(population, name)[indices] for name in COLUMNS}
+            state["indices"] = indices
+            state["counts"] = grid.counts[bounds[0] : bounds[1], bounds[2] : bounds[3]]
+            connection.send(("run_local", (state, seeds[tile])))
+
+    def merge(self, results: List[Dict]) -> None:
+        population, grid = self.world.population, self.world.site_positions
+        if self.world.shared:
+            grid.recount()
+        else:
+            for bounds, result in zip(self.bounds, results):
+                grid.set_block(
+                    slice(bounds[0], bounds[1]),
+                    slice(bounds[2], bounds[3]),
+                    result["counts"],
+                )
+
+        # halo exchange: offspring that crossed a tile border are clamped by
+        # the receiving cell once every tile has finished its tick
+        keys, offspring = np.concatenate([r["outgoing"] for r in results], axis=1)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        offspring = np.bincount(inverse, weights=offspring).astype(np.int64)
+        targets, kinds = np.divmod(keys, ASSET_NUM)
+        room = np.maximum(ASSET_MAX_FOR_TYPE_IN_POINT - grid.cells[targets, kinds], 0)
+        deltas = np.zeros((len(keys), ASSET_NUM), dtype=np.int64)
+        deltas[np.arange(len(keys)), kinds] = np.minimum(offspring, room)
+        grid.add(targets, deltas)
+
+        if self.world.shared:
+            population.recount()
+            self.world._remove(np.concatenate([r["dead"] for r in results]))
+            return
+
+        indices = np.concatenate([r["indices"] for r in results])
+        population.set_age(indices, np.concatenate([r["age"] for r in results]))
+        population.set_assets(indices, np.concatenate([r["assets"] for r in results]))
+        population.starving_days[indices] = np.concatenate(
+            [r["starving_days"] for r in results]
+        )
+        population.influence[indices] = np.concatenate(
+            [r["influence"] for r in results]
+        )
+        population.move(
+            indices,
+            np.concatenate([r["x"] for r in results]),
+            np.concatenate([r["y"] for r in results]),
+        )
+        self.world._remove(np.concatenate([r["dead"] for r in results]))
+
+    def owners(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        tile_x = np.searchsorted(self.x_edges, x, side="right") - 1
+        tile_y = np.searchsorted(self.y_edges, y, side="right") - 1
+        return tile_x * self.tiles[1] + tile_y
+
+    def start(self) -> None:
+        if self._processes:
+            return
+        context = get_context()
+        for bounds in self.bounds:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=serve, args=(child, bounds, self.world.size), daemon=True
+            )
+            process.start()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.send(None)
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
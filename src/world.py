@@ -1,20 +1,100 @@
-from collections import Counter, defaultdict
-from itertools import repeat
-from random import sample, randint, random
-from secrets import choice
-from typing import Dict, List, Tuple
-
-from asset import Asset
-from asset_site import AssetSite
-from conflict import Conflict
+import weakref
+from collections.abc import Sequence
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from asset import Asset, ASSET_INDEX, ASSET_NUM, ASSET_TYPES, GROWABLE_TYPES
+from asset_grid import AssetGrid, SparseAssetGrid
+from batch_solver import BatchDecision, BatchSolver, ConflictBatch
+from conflict import CellGroups, Conflict
 from constants import (
-    ASSET_REPRODUCTION_PROBABILITY,
-    ASSET_MAX_FOR_TYPE_IN_POINT,
-    INDIVIDUAL_MAX_AGE,
+    INDIVIDUAL_HAPPINESS_UNIT,
+    PREFERENCE_MAX_VALUE,
+    PREFERENCE_MIN_VALUE,
+    PREFERENCE_RANDOMNESS_DELTA,
+)
+from dna_helper import combine_codes, new_codes
+from engine import (
+    deaths,
+    EDIBLE,
+    GROWABLE,
+    influences,
+    reproduce,
+    settle_offspring,
+    VectorizedEngine,
 )
 from individual import Individual
+from neighbors import NeighborTable
 from point import Point
-from world_helper import get_points_distributed
+from population import Population
+from profiling import TickProfiler
+from rng import SimulationRNG
+from shared_state import SharedAllocator
+from tiled_engine import TiledEngine
+from world_helper import get_cells_distributed
+
+
+ENGINES = ("object", "vectorized", "tiled")
+
+
+class Cell(list):
+    def __init__(self, world: "World", point: Point, individuals=()) -> None:
+        super().__init__(individuals)
+        self._world = world
+        self._point = point
+
+    def append(self, individual: Individual) -> None:
+        super().append(individual)
+        self._world._settle(self._point, [individual])
+
+    def extend(self, individuals: List[Individual]) -> None:
+        individuals = list(individuals)
+        super().extend(individuals)
+        self._world._settle(self._point, individuals)
+
+
+class Positions(dict):
+    def __init__(self, world: "World") -> None:
+        super().__init__()
+        self._world = world
+
+    def __missing__(self, point: Point) -> Cell:
+        return Cell(self._world, point)
+
+    def __setitem__(self, point: Point, individuals: List[Individual]) -> None:
+        world = self._world
+        world._remove(world._replace(self, point, individuals))
+
+
+class Conflicts(Sequence):
+    # conflicts are only materialized when a caller asks for them
+    def __init__(self, world: "World", groups: CellGroups) -> None:
+        self.groups = groups
+        self.version = world.population.version
+        self._world = world
+        self._built: Dict[int, Conflict] = {}
+
+    def __getitem__(self, index: Union[int, slice]) -> Conflict:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"conflict index {index} out of range")
+        if index not in self._built:
+            # the groups hold row indices, which only mean something as long
+            # as the population has not changed since they were taken
+            if self.version != self._world.population.version:
+                raise RuntimeError(
+                    "conflicts were taken from an older population, "
+                    "call get_conflicts() again"
+                )
+            self._built[index] = self._world._make_conflict(self.groups, index)
+        return self._built[index]
+
+    def __len__(self) -> int:
+        return len(self.groups)
 
 
 class World:
@@ -24,32 +104,140 @@ class World:
         initial_individuals: int = 100,
         initial_populations: int = 10,
         initial_assets: int = 1_000,
+        engine: str = "object",
+        debug: bool = False,
+        seed: int = None,
+        tiles: Tuple[int, int] = (2, 2),
+        shared: bool = False,
+        sparse: bool = False,
     ) -> None:
+        if engine not in ENGINES:
+            raise RuntimeError(f"unknown engine {engine}, expected one of {ENGINES}")
+        if sparse and (shared or engine == "tiled"):
+            raise RuntimeError("sparse worlds cannot be shared or tiled")
         self.size = size
         self.initial_individuals = initial_individuals
         self.initial_populations = initial_populations
         self.initial_assets = initial_assets
+        self.debug = debug
+        self.rng = SimulationRNG(seed)
+        self.neighbors = NeighborTable(size)
+        self.shared = shared
+        self.sparse = sparse
+        self._allocator = SharedAllocator() if shared else None
 
-        self.individuals_positions = defaultdict(list)
+        self.population = Population(allocator=self._allocator)
+        self._positions = weakref.ref(Positions(self))
+        self._positions_version = -1
+        if shared:
+            self._occupancy_counts = self._allocator.empty(size, np.int32)
+        elif not sparse:
+            self._occupancy_counts = np.zeros(size, dtype=np.int32)
+        self._occupancy_version = -1
+        self._groups = None
+        self._groups_version = -1
         self._distribute_individuals()
 
-        self.site_positions = defaultdict(AssetSite)
+        if sparse:
+            self.site_positions = SparseAssetGrid(size)
+        else:
+            self.site_positions = AssetGrid(size, self._allocator)
         self._distribute_assets()
         self.time_is_passing = False
+        self.tick = 0
+        self.profiler = None
+        # lifecycle counts since the world was created, rows that only move
+        # between populations (e.g. through a solver) are neither
+        self.births = 0
+        self.deaths = 0
+        self._conflict_count = (-1, 0)
+
+        self.engine = engine
+        if engine == "vectorized":
+            self._engine = VectorizedEngine(self)
+        elif engine == "tiled":
+            self._engine = TiledEngine(self, tiles)
+        else:
+            self._engine = None
+
+    @property
+    def individuals_positions(self) -> Dict[Point, List[Individual]]:
+        # cached weakly, so the views it holds die with the caller's last
+        # reference instead of living on until the next access
+        population = self.population
+        positions = self._positions()
+        if positions is not None and self._positions_version == population.version:
+            return positions
+        positions = Positions(self)
+        groups = self.cell_groups
+        for group, point in enumerate(self._points(groups.cells)):
+            individuals = [
+                Individual.from_population(population, index)
+                for index in groups.members_of(group).tolist()
+            ]
+            dict.__setitem__(positions, point, Cell(self, point, individuals))
+        self._positions = weakref.ref(positions)
+        self._positions_version = population.version
+        return positions
+
+    @property
+    def occupancy(self) -> np.ndarray:
+        if self.sparse:
+            raise RuntimeError("sparse worlds keep no dense occupancy grid")
+        self._update_occupancy()
+        occupancy = self._occupancy_counts.view()
+        occupancy.flags.writeable = False
+        return occupancy
+
+    @property
+    def cell_groups(self) -> CellGroups:
+        population = self.population
+        if self._groups_version != population.version:
+            self._groups = CellGroups.from_cells(
+                population.x * self.size[1] + population.y
+            )
+            self._groups_version = population.version
+        return self._groups
+
+    @property
+    def occupied_cells(self) -> Tuple[np.ndarray, np.ndarray]:
+        groups = self.cell_groups
+        return groups.cells, groups.sizes
+
+    def conflict_groups(self) -> CellGroups:
+        groups = self.cell_groups
+        return groups.select(groups.sizes > 1)
+
+    def occupied(self, cells: np.ndarray) -> np.ndarray:
+        if self.sparse:
+            return np.isin(cells, self.occupied_cells[0])
+        return self.occupancy.reshape(-1)[cells] > 0
+
+    def shared_spec(self) -> Dict:
+        if not self.shared:
+            raise RuntimeError("world was not created with shared=True")
+        self._update_occupancy()
+        arrays = self.population.shared_spec()
+        arrays["counts"] = self.site_positions.shared_spec()
+        arrays["occupancy"] = self._allocator.spec(self._occupancy_counts)
+        return {"size": len(self.population), "arrays": arrays}
 
     @property
     def indicators(self) -> Dict[str, float]:
-        all_individuals = self.get_all_individuals()
-        total_population = len(all_individuals)
+        if self.debug:
+            self._check_aggregates()
+        population = self.population
+        total_population = len(population)
         if total_population == 0:
             avg_happines = 0
             avg_age = 0.0
         else:
-            happinesses, ages = list(
-                map(list, zip(*[(i.happiness, i.age) for i in all_individuals]))
+            avg_happines = (
+                population.happiness_total
+                * INDIVIDUAL_HAPPINESS_UNIT
+                / float(total_population)
             )
-            avg_happines = sum(happinesses) / float(total_population)
-            avg_age = sum(ages) / float(total_population)
+            avg_age = population.age_total / float(total_population)
         return {
             "total_population": total_population,
             "avg_happines": avg_happines,
@@ -58,146 +246,389 @@ class World:
 
     @property
     def total_assets(self) -> int:
-        total = 0
-        for site in self.site_positions.values():
-            total += len(site)
-        for individual in self.get_all_individuals():
-            total += len(individual.assets)
-        return total
-
-    def get_conflicts(self) -> List[Conflict]:
-        conflicts = []
-        for point, individuals in self.individuals_positions.items():
-            if len(individuals) > 1:
-                conflicts.append(
-                    Conflict(point, individuals, self.site_positions[point])
-                )
-        return conflicts
+        if self.debug:
+            self._check_aggregates()
+        return self.site_positions.total + int(self.population.assets_total.sum())
+
+    @property
+    def asset_ledger(self) -> Dict[str, Dict[str, int]]:
+        if self.debug:
+            self._check_aggregates()
+        return {
+            "site": World._by_type(self.site_positions.totals),
+            "inventory": World._by_type(self.population.assets_total),
+        }
+
+    def get_conflicts(self) -> Conflicts:
+        return Conflicts(self, self._count_conflicts(self.conflict_groups()))
+
+    def conflict_count(self) -> int:
+        # conflicts of this tick as first taken, i.e. before they were solved
+        tick, count = self._conflict_count
+        if tick == self.tick:
+            return count
+        return len(self.conflict_groups())
 
     def solve_conflicts(self, solutions: List[Conflict] = None) -> None:
+        # a lazy Conflicts passed back as is must be built before any change
+        solutions = list(solutions)
+        positions = self.individuals_positions
+        dead, newborns = [], {}
         for solution in solutions:
-            self.individuals_positions[solution.place] = solution.individuals
+            dead.extend(
+                self._replace(positions, solution.place, solution.individuals, newborns)
+            )
             self.site_positions[solution.place] = solution.assets
+        self._adopt(newborns)
+        self._remove(dead)
+
+    def get_conflict_batch(self) -> ConflictBatch:
+        groups = self._count_conflicts(self.conflict_groups())
+        population, members = self.population, groups.members
+        return ConflictBatch(
+            groups=groups,
+            age=population.age[members],
+            influence=population.influence[members],
+            starving_days=population.starving_days[members],
+            happiness=population.happiness[members],
+            preferences=population.preferences[members],
+            assets=population.assets[members],
+            bases=population.bases[members],
+            site_assets=self.site_positions.lookup(groups.cells).astype(np.int64),
+            version=population.version,
+        )
+
+    def apply_decision(self, batch: ConflictBatch, decision: BatchDecision) -> None:
+        population = self.population
+        if batch.version != population.version:
+            raise RuntimeError("conflict batch was taken from an older population")
+        groups, members = batch.groups, batch.members
+        assets = np.asarray(decision.assets, dtype=np.int64)
+        site_assets = np.asarray(decision.site_assets, dtype=np.int64)
+        survives = np.asarray(decision.survives, dtype=bool)
+        parents = np.asarray(decision.parents, dtype=np.int64).reshape(-1, 2)
+        offspring = np.asarray(decision.offspring_assets, dtype=np.int64).reshape(
+            -1, ASSET_NUM
+        )
+        World._check_decision(batch, assets, site_assets, survives, parents, offspring)
+
+        population.set_assets(members, assets)
+        self.site_positions.add(groups.cells, site_assets - batch.site_assets)
+        if len(parents):
+            self._give_birth(
+                members[parents], groups.cells[batch.group_index[parents[:, 0]]]
+            )
+            population.set_assets(
+                np.arange(len(population) - len(parents), len(population)), offspring
+            )
+        self._remove(members[~survives])
+        # the batch rows are spent even when nobody was born or removed
+        population.version += 1
+
+    def solve_batch(self, solver: BatchSolver) -> None:
+        batch = self.get_conflict_batch()
+        self.apply_decision(batch, solver(batch, self.rng))
 
     def move_time(self) -> None:
-        self._collect_assets()
-        self._regenerate_assets()
-        self._age_individuals()
-        self._update_influences()
-        self._move_individuals()
+        if self._engine is not None:
+            self._engine.move_time()
+        else:
+            self._collect_assets()
+            self._regenerate_assets()
+            self._age_individuals()
+            self._update_influences()
+            self._move_individuals()
+        self.tick += 1
+        if self.debug:
+            self._check_aggregates()
+
+    def enable_profiling(
+        self, profile_tick: int = None, profile_path: str = "tick.prof"
+    ) -> TickProfiler:
+        self.disable_profiling()
+        self.profiler = TickProfiler(profile_tick, profile_path)
+        self.profiler.attach(self)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        if self.profiler is not None:
+            self.profiler.detach()
+            self.profiler = None
+
+    def close(self) -> None:
+        if isinstance(self._engine, TiledEngine):
+            self._engine.close()
+        if self._allocator is not None:
+            self._allocator.close()
 
     def get_individuals_not_competing(self) -> List[Tuple[Point, Individual]]:
-        free_individuals = []
-        for point, individuals in self.individuals_positions.items():
-            if len(individuals) == 1:
-                free_individuals.append((point, individuals[0]))
-        return free_individuals
+        groups = self.cell_groups
+        solo = groups.select(groups.sizes == 1)
+        return [
+            (point, Individual.from_population(self.population, index))
+            for point, index in zip(self._points(solo.cells), solo.members.tolist())
+        ]
 
     def get_all_individuals(self) -> List[Individual]:
-        all_individuals = []
-        for point in self.individuals_positions:
-            all_individuals.extend(self.individuals_positions[point])
-        return all_individuals
+        return [
+            Individual.from_population(self.population, index)
+            for index in range(len(self.population))
+        ]
 
     def get_assets_free_and_growable(self) -> List[Tuple[Point, Asset]]:
+        growable = [ASSET_INDEX[asset_type] for asset_type in GROWABLE_TYPES]
+        cells, counts = self.site_positions.occupied()
+        counts = counts[:, growable] * ~self.occupied(cells)[:, None]
+        rows, kinds = np.nonzero(counts)
+        x, y = np.divmod(cells[rows], self.size[1])
         eligible_assets = []
-        for point, assets in self.site_positions.items():
-            if len(self.individuals_positions[point]) == 0:
-                eligible_assets.extend(zip(repeat(point), assets.get_growable_assets()))
+        for x, y, kind, n in zip(
+            x.tolist(), y.tolist(), kinds.tolist(), counts[rows, kinds].tolist()
+        ):
+            point, asset_type = Point(x, y), GROWABLE_TYPES[kind]
+            eligible_assets.extend((point, Asset(asset_type)) for _ in range(n))
         return eligible_assets
 
     def is_valid_point(self, point: Point) -> bool:
         return 0 <= point.x < self.size[0] and 0 <= point.y < self.size[1]
 
     def get_random_neighboor(self, point: Point) -> Point:
-        options = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        while True:
-            dx, dy = choice(options)
-            neighboor = Point(point.x + dx, point.y + dy)
-            if self.is_valid_point(neighboor):
-                return neighboor
+        return self.neighbors.neighbor(point, self.rng.random())
 
     def _collect_assets(self) -> None:
         not_competing = self.get_individuals_not_competing()
         for point, individual in not_competing:
             self.site_positions[point] = individual.collect_assets(
-                self.site_positions[point]
+                self.site_positions[point], self.rng
             )
 
     def _regenerate_assets(self) -> None:
-        assets = self.get_assets_free_and_growable()
-        for point, asset in assets:
-            neighbor = self.get_random_neighboor(point)
-            total_of_kind_in_point = self.site_positions[neighbor].total_of_type(
-                asset.asset_type
-            )
-            if (
-                total_of_kind_in_point < ASSET_MAX_FOR_TYPE_IN_POINT
-                and random() < ASSET_REPRODUCTION_PROBABILITY
-            ):
-                self.site_positions[neighbor].append(Asset(asset.asset_type))
+        grid = self.site_positions
+        cells, counts = grid.occupied()
+        free = ~self.occupied(cells)
+        sources, kinds = reproduce(
+            cells[free], counts[free][:, GROWABLE], self.rng.generator
+        )
+        x, y = self.neighbors.sample(
+            *np.divmod(sources, self.size[1]), self.rng.uniforms(len(sources))
+        )
+        grid.add(*settle_offspring(x * self.size[1] + y, kinds, grid.lookup))
 
     def _age_individuals(self) -> None:
-        for point in self.individuals_positions:
-            individuals = self.individuals_positions[point]
-            alive = []
-            for individual in individuals:
-                is_alive = individual.get_old(1)
-                if is_alive:
-                    alive.append(individual)
-                else:
-                    self.site_positions[point].extend(individual.assets)
-            self.individuals_positions[point] = alive
+        population = self.population
+        population.set_age(slice(None), population.age + 1)
+        has_food = population.assets[:, EDIBLE] > 0
+        population.change_assets((np.flatnonzero(has_food), EDIBLE), -1)
+        starving_days = population.starving_days
+        starving_days[has_food] = 0
+        starving_days[~has_food] += 1
+
+        dead = np.flatnonzero(
+            deaths(population.age, starving_days, self.rng.uniforms(len(population)))
+        )
+        cells = population.x[dead] * self.size[1] + population.y[dead]
+        self.site_positions.add(cells, population.assets[dead])
+        self._remove(dead)
 
     def _update_influences(self) -> None:
-        all_individuals = self.get_all_individuals()
-        all_bases = Individual.avg_dna_counts(all_individuals)
-        world_wealth = float(self.total_assets)
-        for individual in all_individuals:
-            distance = individual.dna_distance(all_bases)
-            if distance > 0 and world_wealth > 0:
-                individual.influence = (
-                    (1.0 / distance)
-                    * float(individual.age)
-                    / float(INDIVIDUAL_MAX_AGE)
-                    * float(len(individual.assets))
-                    / world_wealth
-                )
-            else:
-                individual.influence = 1.0
+        population = self.population
+        population.influence[:] = influences(
+            population.dna_distances(),
+            population.age,
+            population.assets.sum(axis=1),
+            float(self.total_assets),
+        )
 
     def _move_individuals(self) -> None:
-        new_positions = defaultdict(list)
-        for point in self.individuals_positions:
-            individuals = self.individuals_positions[point]
-            for individual in individuals:
-                neighboor = self.get_random_neighboor(point)
-                new_positions[neighboor].append(individual)
-        self.individuals_positions = new_positions
+        population = self.population
+        x, y = self.neighbors.sample(
+            population.x, population.y, self.rng.uniforms(len(population))
+        )
+        population.move(slice(None), x, y)
 
     def _distribute_individuals(self) -> None:
-        points = get_points_distributed(
-            grid_size=self.size, num_points=self.initial_populations
+        centers = get_cells_distributed(
+            grid_size=self.size, num_points=self.initial_populations, rng=self.rng
         )
-        individuals = Individual.get_individuals(size=self.initial_individuals)
+        size = self.initial_individuals
+        if size == 0:
+            return
+        if len(centers) == 0:
+            raise RuntimeError(f"cannot place {size} individuals without populations")
+        x, y = np.divmod(centers[self.rng.integers(len(centers), size)], self.size[1])
+        x = np.clip(x + self.rng.integers(3, size) - 1, 0, self.size[0] - 1)
+        y = np.clip(y + self.rng.integers(3, size) - 1, 0, self.size[1] - 1)
+
+        levels = np.linspace(PREFERENCE_MIN_VALUE, PREFERENCE_MAX_VALUE, ASSET_NUM)
+        preferences = self.rng.generator.permuted(np.tile(levels, (size, 1)), axis=1)
+        dna = new_codes(size, rng=self.rng)
+        self.population.add_many(dna, preferences, x, y)
+
+    def _check_aggregates(self) -> None:
+        population = self.population
+        expected = {
+            "age": int(population.age.sum()),
+            "happiness": float(np.sum(population.preferences * population.assets)),
+            "inventory": population.assets.sum(axis=0).tolist(),
+            "site": self.site_positions.occupied()[1].sum(axis=0).tolist(),
+        }
+        actual = {
+            "age": population.age_total,
+            "happiness": population.happiness_total,
+            "inventory": population.assets_total.tolist(),
+            "site": self.site_positions.totals.tolist(),
+        }
+        for name, value in expected.items():
+            if not np.allclose(actual[name], value):
+                raise RuntimeError(
+                    f"{name} aggregate drifted: expected {value}, got {actual[name]}"
+                )
+
+    @staticmethod
+    def _by_type(totals: np.ndarray) -> Dict[str, int]:
+        return {at.name: int(total) for at, total in zip(ASSET_TYPES, totals)}
+
+    def _give_birth(self, parents: np.ndarray, cells: np.ndarray) -> None:
+        population = self.population
+        first, second = parents[:, 0], parents[:, 1]
+        dna = combine_codes(
+            population.dna[first], population.dna[second], population.dna_size, self.rng
+        )
+        randomness = (
+            self.rng.uniforms(len(parents))[:, None] * 2 - 1
+        ) * PREFERENCE_RANDOMNESS_DELTA
+        preferences = np.clip(
+            (population.preferences[first] + population.preferences[second]) / 2.0
+            + randomness,
+            PREFERENCE_MIN_VALUE,
+            PREFERENCE_MAX_VALUE,
+        )
+        x, y = np.divmod(cells, self.size[1])
+        population.add_many(dna, preferences, x, y)
+        self.births += len(parents)
+
+    @staticmethod
+    def _check_decision(
+        batch: ConflictBatch,
+        assets: np.ndarray,
+        site_assets: np.ndarray,
+        survives: np.ndarray,
+        parents: np.ndarray,
+        offspring: np.ndarray,
+    ) -> None:
+        members, conflicts = len(batch.members), len(batch)
+        expected = {
+            "assets": (assets.shape, (members, ASSET_NUM)),
+            "site_assets": (site_assets.shape, (conflicts, ASSET_NUM)),
+            "survives": (survives.shape, (members,)),
+            "offspring_assets": (offspring.shape, (len(parents), ASSET_NUM)),
+        }
+        for name, (shape, expected_shape) in expected.items():
+            if shape != expected_shape:
+                raise RuntimeError(
+                    f"decision {name} has shape {shape}, expected {expected_shape}"
+                )
+        if (assets < 0).any() or (site_assets < 0).any() or (offspring < 0).any():
+            raise RuntimeError("decision holds negative asset counts")
+        group_index = batch.group_index
+        if len(parents) and (
+            (parents < 0).any()
+            or (parents >= members).any()
+            or (group_index[parents[:, 0]] != group_index[parents[:, 1]]).any()
+        ):
+            raise RuntimeError("parents must be two members of the same conflict")
+
+        before = batch.site_assets.astype(np.int64)
+        np.add.at(before, group_index, batch.assets)
+        after = site_assets.copy()
+        np.add.at(after, group_index, assets)
+        if len(parents):
+            np.add.at(after, group_index[parents[:, 0]], offspring)
+        if not np.array_equal(before, after):
+            raise RuntimeError("decision does not conserve the assets of a conflict")
+
+    def _make_conflict(self, groups: CellGroups, group: int) -> Conflict:
+        point = self._points(groups.cells[group : group + 1])[0]
+        individuals = [
+            Individual.from_population(self.population, index)
+            for index in groups.members_of(group).tolist()
+        ]
+        return Conflict(point, individuals, self.site_positions[point])
+
+    def _remove(self, indices: List[int]) -> None:
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        self.deaths += len(indices)
+        self.population.remove(indices)
+
+    def _count_conflicts(self, groups: CellGroups) -> CellGroups:
+        if self._conflict_count[0] != self.tick:
+            self._conflict_count = (self.tick, len(groups))
+        return groups
+
+    def _points(self, cells: np.ndarray) -> List[Point]:
+        x, y = np.divmod(cells, self.size[1])
+        return list(map(Point, x.tolist(), y.tolist()))
+
+    def _update_occupancy(self) -> None:
+        population = self.population
+        if self._occupancy_version == population.version:
+            return
+        counts = np.bincount(
+            population.x * self.size[1] + population.y,
+            minlength=self.size[0] * self.size[1],
+        )
+        self._occupancy_counts[...] = counts.reshape(self.size)
+        self._occupancy_version = population.version
+
+    def _settle(
+        self,
+        point: Point,
+        individuals: List[Individual],
+        newborns: Dict[int, Tuple[Individual, Point]] = None,
+    ) -> None:
+        # individuals of no world yet are collected into newborns, keyed by
+        # id so the last place wins, and adopted together by the caller
+        pending = {} if newborns is None else newborns
         for individual in individuals:
-            position = sample(points, k=1)[0]
-            position = Point(position.x, position.y)
-            position = self._randomize_point(position)
-            self.individuals_positions[position].append(individual)
-
-    def _randomize_point(self, point: Point, units: int = 1) -> Point:
-        dx = randint(-units, units)
-        dy = randint(-units, units)
-        point.x = min(max(0, point.x + dx), self.size[0] - 1)
-        point.y = min(max(0, point.y + dy), self.size[1] - 1)
-        return point
+            index = self.population.index_of(individual)
+            if index is None:
+                pending[id(individual)] = (individual, point)
+            else:
+                self.population.move(index, point.x, point.y)
+        if newborns is None:
+            self._adopt(pending)
+
+    def _adopt(self, newborns: Dict[int, Tuple[Individual, Point]]) -> None:
+        if not newborns:
+            return
+        individuals, points = zip(*newborns.values())
+        self.population.adopt_many(
+            individuals, [point.x for point in points], [point.y for point in points]
+        )
+        self.births += len(individuals)
+
+    def _replace(
+        self,
+        positions: Dict[Point, List[Individual]],
+        point: Point,
+        individuals: List[Individual],
+        newborns: Dict[int, Tuple[Individual, Point]] = None,
+    ) -> List[int]:
+        survivors = set(map(id, individuals))
+        dead = [
+            self.population.index_of(individual)
+            for individual in positions[point]
+            if id(individual) not in survivors
+        ]
+        self._settle(point, individuals, newborns)
+        return dead
 
     def _distribute_assets(self) -> None:
-        points = get_points_distributed(
-            grid_size=self.size, num_points=self.initial_assets, unique=False
+        cells = get_cells_distributed(
+            grid_size=self.size,
+            num_points=self.initial_assets,
+            unique=False,
+            rng=self.rng,
         )
-        points_counter = Counter(points)
-        for point, num_assets in points_counter.items():
-            assets = Asset.get_assets(size=num_assets)
-            self.site_positions[point].extend(assets)
+        kinds = self.rng.integers(ASSET_NUM, self.initial_assets)
+        self.site_positions.scatter(cells, kinds)
@@ -1,30 +1,43 @@
-from random import randint, random, shuffle
+from random import random, shuffle
 from typing import List, Tuple
+
+import numpy as np
+
 from asset_site import AssetSite
 
 from conflict import Conflict
 from constants import *
 from individual import Individual
 from point import Point
+from rng import SimulationRNG, fallback_generator
 
 
-def get_points_distributed(
-    grid_size: Tuple[int, int], num_points: int, unique: bool = True
-) -> List[Point]:
-    if unique and num_points > grid_size[0] * grid_size[1]:
+def get_cells_distributed(
+    grid_size: Tuple[int, int],
+    num_points: int,
+    unique: bool = True,
+    rng: SimulationRNG = None,
+) -> np.ndarray:
+    num_cells = grid_size[0] * grid_size[1]
+    if unique and num_points > num_cells:
         raise RuntimeError(
             f"cannot uniquely place {num_points} in grid {grid_size[0]}x{grid_size[1]}"
         )
-    points = []
-    for _ in range(num_points):
-        point = Point(randint(0, grid_size[0] - 1), randint(0, grid_size[1] - 1))
-        if unique:
-            while point in points:
-                point = Point(
-                    randint(0, grid_size[0] - 1), randint(0, grid_size[1] - 1)
-                )
-        points.append(point)
-    return points
+    source = fallback_generator() if rng is None else rng.generator
+    if unique:
+        return source.choice(num_cells, size=num_points, replace=False)
+    return source.integers(0, num_cells, num_points)
+
+
+def get_points_distributed(
+    grid_size: Tuple[int, int],
+    num_points: int,
+    unique: bool = True,
+    rng: SimulationRNG = None,
+) -> List[Point]:
+    cells = get_cells_distributed(grid_size, num_points, unique, rng)
+    x, y = np.divmod(cells, grid_size[1])
+    return list(map(Point, x.tolist(), y.tolist()))
 
 
 def take(giver: Individual, receiver: Individual) -> None:
@@ -40,21 +53,24 @@ def solve_duel(left: Individual, right: Individual) -> None:
         take(right, left)
 
 
-def harvest_by_influence(individuals: List[Individual], assets: AssetSite) -> AssetSite:
+def harvest_by_influence(
+    individuals: List[Individual], assets: AssetSite, rng: SimulationRNG = None
+) -> AssetSite:
     individuals = sorted(individuals, key=lambda i: i.influence, reverse=True)
     for individual in individuals:
-        assets = individual.collect_assets(assets)
-    shuffle(individuals)
+        assets = individual.collect_assets(assets, rng)
+    (shuffle if rng is None else rng.shuffle)(individuals)
     return assets
 
 
 def solve_interaction_naturally(
-    left: Individual, right: Individual
+    left: Individual, right: Individual, rng: SimulationRNG = None
 ) -> List[Individual]:
+    draw = random if rng is None else rng.random
     final_individuals = []
-    if random() < INDIVIDUAL_REPRODUCTION_PROBABILITY:
-        final_individuals.extend(left.reproduce_with(right))
-    elif random() < INDIVIDUAL_ASSASSINATION_PROBABILITY:
+    if draw() < INDIVIDUAL_REPRODUCTION_PROBABILITY:
+        final_individuals.extend(left.reproduce_with(right, rng))
+    elif draw() < INDIVIDUAL_ASSASSINATION_PROBABILITY:
         final_individuals.extend(left.fight(right))
     else:
         solve_duel(left, right)
@@ -62,14 +78,16 @@ def solve_interaction_naturally(
     return final_individuals
 
 
-def solve_naturally(conflict: Conflict) -> Conflict:
-    conflict.assets = harvest_by_influence(conflict.individuals, conflict.assets)
+def solve_naturally(conflict: Conflict, rng: SimulationRNG = None) -> Conflict:
+    conflict.assets = harvest_by_influence(conflict.individuals, conflict.assets, rng)
     final_individuals = []
     for left, right in zip(conflict.individuals[::2], conflict.individuals[1::2]):
-        final_individuals.extend(solve_interaction_naturally(left, right))
+        final_individuals.extend(solve_interaction_naturally(left, right, rng))
     conflict.individuals = final_individuals
     return conflict
 
 
-def natural_solver(conflicts: List[Conflict]) -> List[Conflict]:
-    return [solve_naturally(c) for c in conflicts]
+def natural_solver(
+    conflicts: List[Conflict], rng: SimulationRNG = None
+) -> List[Conflict]:
+    return [solve_naturally(c, rng) for c in conflicts]
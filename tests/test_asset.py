@@ -70,3 +70,8 @@ def test_asset_repr():
 def test_asset_hash():
     asset = Asset(AssetType.EDIBLE)
     assert hash(asset) == hash(str(AssetType.EDIBLE.name))
+
+
+def test_asset_eq():
+    assert Asset(AssetType.EDIBLE) == Asset(AssetType.EDIBLE)
+    assert Asset(AssetType.EDIBLE) != Asset(AssetType.GROWABLE)
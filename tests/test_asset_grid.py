@@ -0,0 +1,122 @@
+import numpy as np
+
+from asset import Asset, AssetType
+from asset_grid import AssetGrid, SparseAssetGrid
+from asset_site import AssetSite
+from point import Point
+
+
+def test_site_view_writes_through():
+    grid = AssetGrid((5, 5))
+    point = Point(1, 2)
+    grid[point].append(Asset(AssetType.EDIBLE))
+    grid[point].extend(Asset.get_non_growable(2))
+
+    assert grid.counts[1, 2].tolist() == [1, 0, 2]
+    assert len(grid[point]) == 3
+    assert grid[point].total_of_type(AssetType.NON_GROWABLE) == 2
+    assert Asset(AssetType.EDIBLE) in grid[point]
+    assert Asset(AssetType.GROWABLE) not in grid[point]
+
+
+def test_site_view_iteration():
+    grid = AssetGrid((5, 5))
+    site = grid[Point(0, 0)]
+    site.extend(Asset.get_edible(2) + Asset.get_growable(1))
+    site.extend(Asset.get_non_growable(3))
+
+    assert sorted(a.asset_type.name for a in site) == sorted(
+        ["EDIBLE"] * 2 + ["GROWABLE"] + ["NON_GROWABLE"] * 3
+    )
+    assert len(site.get_growable_assets()) == 3
+
+
+def test_set_site():
+    grid = AssetGrid((5, 5))
+    site = AssetSite()
+    site.extend(Asset.get_growable(4))
+    grid[Point(4, 4)] = site
+    assert grid.counts[4, 4].tolist() == [0, 4, 0]
+
+
+def test_nonempty_cells():
+    grid = AssetGrid((5, 5))
+    grid[Point(0, 1)].append(Asset(AssetType.EDIBLE))
+    grid[Point(3, 2)].extend(Asset.get_growable(2))
+
+    assert len(grid) == 2
+    assert grid.keys() == [Point(0, 1), Point(3, 2)]
+    assert list(map(len, grid.values())) == [1, 2]
+    assert Point(0, 1) in grid
+    assert Point(0, 0) not in grid
+    assert grid.total == 3
+
+
+def test_totals_follow_changes():
+    grid = AssetGrid((5, 5))
+    grid[Point(0, 0)].extend(Asset.get_edible(3))
+    grid[Point(0, 0)].remove(AssetType.EDIBLE)
+    grid.add([1, 1, 7], [[0, 1, 0], [0, 1, 0], [0, 0, 5]])
+    site = AssetSite()
+    site.add(AssetType.NON_GROWABLE, 2)
+    grid[Point(1, 2)] = site
+
+    assert grid.totals.tolist() == [2, 2, 2]
+    assert grid.totals.tolist() == grid.counts.sum(axis=(0, 1)).tolist()
+    assert grid.counts[0, 1].tolist() == [0, 2, 0]
+
+
+def test_sparse_site_view_writes_through():
+    grid = SparseAssetGrid((100_000, 100_000))
+    point = Point(99_999, 12)
+    site = grid[point]
+    assert len(grid) == 0 and point not in grid
+    site.add(AssetType.GROWABLE, 3)
+    site.remove(AssetType.GROWABLE, 1)
+    assert grid[point].counts == [0, 2, 0]
+    assert grid.keys() == [point]
+    assert grid.totals.tolist() == [0, 2, 0]
+    grid[point].remove(AssetType.GROWABLE, 2)
+    assert len(grid) == 0
+    assert grid.total == 0
+
+
+def test_sparse_add_prunes_and_keeps_order():
+    grid = SparseAssetGrid((10, 10))
+    grid.scatter(np.array([42, 7, 42, 99]), np.array([0, 1, 2, 0]))
+    cells, counts = grid.occupied()
+    assert cells.tolist() == [7, 42, 99]
+    assert counts.tolist() == [[0, 1, 0], [1, 0, 1], [1, 0, 0]]
+    grid.add(np.array([42, 42, 3]), np.array([[-1, 0, 0], [0, 0, -1], [0, 2, 0]]))
+    assert grid.occupied()[0].tolist() == [3, 7, 99]
+    assert grid.lookup(np.array([3, 42, 99])).tolist() == [
+        [0, 2, 0],
+        [0, 0, 0],
+        [1, 0, 0],
+    ]
+    assert grid.totals.tolist() == [1, 3, 0]
+
+
+def test_sparse_set_site():
+    grid = SparseAssetGrid((5, 5))
+    grid[Point(2, 3)] = AssetSite([1, 2, 0])
+    grid[Point(0, 1)] = AssetSite([0, 0, 4])
+    grid[Point(2, 3)] = AssetSite()
+    assert grid.keys() == [Point(0, 1)]
+    assert grid.total == 4
+
+
+def test_sparse_cell_writes_are_batched():
+    grid = SparseAssetGrid((10, 10))
+    grid.scatter(np.array([5, 50]), np.array([0, 0]))
+    keys = grid._keys
+    grid[Point(9, 9)].add(AssetType.GROWABLE, 2)
+    grid[Point(0, 1)].add(AssetType.EDIBLE, 1)
+    grid[Point(0, 5)].remove(AssetType.EDIBLE, 1)
+    assert grid._keys is keys
+    assert Point(9, 9) in grid and Point(0, 5) not in grid
+    assert grid[Point(0, 1)].counts == [1, 0, 0]
+    cells, counts = grid.occupied()
+    assert cells.tolist() == [1, 50, 99]
+    assert counts.tolist() == [[1, 0, 0], [1, 0, 0], [0, 2, 0]]
+    assert grid.totals.tolist() == [2, 2, 0]
@@ -1,6 +1,9 @@
 from collections import defaultdict
+from unittest.mock import patch
 
-from asset import Asset
+import pytest
+
+from asset import Asset, ASSET_TYPES, AssetType
 from asset_site import AssetSite
 
 
@@ -59,3 +62,63 @@ def test_get_growable_assets():
     site.extend(non_growable)
 
     assert len(site.get_growable_assets()) == 6
+
+
+def test_site_add_remove():
+    site = AssetSite()
+    site.add(AssetType.GROWABLE, 3)
+    site.remove(AssetType.GROWABLE, 2)
+    assert site.total_of_type(AssetType.GROWABLE) == 1
+    assert len(site) == 1
+
+
+def test_site_remove_too_many_raises():
+    site = AssetSite()
+    site.add(AssetType.EDIBLE, 1)
+    with pytest.raises(RuntimeError):
+        site.remove(AssetType.EDIBLE, 2)
+    assert site.total_of_type(AssetType.EDIBLE) == 1
+
+
+def test_site_merge():
+    site1, site2 = AssetSite(), AssetSite()
+    site1.add(AssetType.EDIBLE, 2)
+    site2.add(AssetType.EDIBLE, 1)
+    site2.add(AssetType.NON_GROWABLE, 4)
+    site1.merge(site2)
+    assert site1.counts == [3, 0, 4]
+    assert site2.counts == [1, 0, 4]
+
+
+@pytest.mark.parametrize("draw, taken_counts", [(0.0, [2, 3, 4]), (1.0, [0, 0, 0])])
+@patch("asset_site.random")
+def test_site_split(random_mock, draw, taken_counts):
+    random_mock.return_value = draw
+    site = AssetSite([2, 3, 4])
+    taken, left = site.split({at: 0.5 for at in ASSET_TYPES})
+    assert taken.counts == taken_counts
+    assert [t + l for t, l in zip(taken.counts, left.counts)] == [2, 3, 4]
+    assert site.counts == [2, 3, 4]
+
+
+def test_site_iteration_is_reentrant():
+    site = AssetSite([1, 1, 0])
+    pairs = [(a.asset_type, b.asset_type) for a in site for b in site]
+    assert len(pairs) == 4
+
+
+def test_site_backed_by_counts():
+    counts = [0, 0, 0]
+    site = AssetSite(counts)
+    site.append(Asset(AssetType.NON_GROWABLE))
+    assert counts == [0, 0, 1]
+
+
+def test_sample_without_replacement():
+    site = AssetSite([5, 0, 3])
+    taken, left = site.sample(6)
+    assert len(taken) == 6
+    assert [a + b for a, b in zip(taken.counts, left.counts)] == [5, 0, 3]
+    assert taken.total_of_type(AssetType.GROWABLE) == 0
+    with pytest.raises(RuntimeError):
+        site.sample(9)
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from asset import Asset
+from batch_solver import influence_batch_solver
+from individual import Individual
+from point import Point
+from world import World
+
+
+def make_world() -> World:
+    world = World(
+        size=(10, 10),
+        initial_assets=0,
+        initial_individuals=0,
+        initial_populations=0,
+        seed=0,
+    )
+    individuals = Individual.get_individuals(5)
+    for i, individual in enumerate(individuals):
+        individual.influence = i
+    world.individuals_positions[Point(2, 2)].extend(individuals[:2])
+    world.individuals_positions[Point(0, 5)].extend(individuals[2:])
+    world.site_positions[Point(2, 2)].extend(Asset.get_edible(3))
+    world.site_positions[Point(0, 5)].extend(Asset.get_non_growable(2))
+    return world
+
+
+def test_padded_features():
+    batch = make_world().get_conflict_batch()
+    influence, mask = batch.padded(batch.influence, fill=-1)
+    assert influence.tolist() == [[2, 3, 4], [0, 1, -1]]
+    assert mask.tolist() == [[True, True, True], [True, True, False]]
+    assert batch.site_assets.tolist() == [[0, 0, 2], [3, 0, 0]]
+    preferences, _ = batch.padded(batch.preferences)
+    assert preferences.shape == (2, 3, 3)
+
+
+def test_influence_batch_solver():
+    batch = make_world().get_conflict_batch()
+    decision = influence_batch_solver(batch)
+    assert decision.assets.tolist() == [
+        [0, 0, 0],
+        [0, 0, 0],
+        [0, 0, 2],
+        [0, 0, 0],
+        [3, 0, 0],
+    ]
+    assert decision.site_assets.sum() == 0
+    assert decision.survives.all()
+
+
+def test_apply_decision_in_bulk():
+    world = make_world()
+    batch = world.get_conflict_batch()
+    world.solve_batch(influence_batch_solver)
+    assert len(world.site_positions[Point(2, 2)]) == 0
+    assert len(world.site_positions[Point(0, 5)]) == 0
+    winners = [i for i in world.get_all_individuals() if i.assets]
+    assert sorted(i.influence for i in winners) == [1, 4]
+    assert world.total_assets == 5
+    assert batch.version != world.population.version
+
+
+def test_apply_decision_with_births_and_deaths():
+    world = make_world()
+    batch = world.get_conflict_batch()
+    decision = influence_batch_solver(batch)
+    decision.survives[0] = False
+    decision.parents = np.array([[3, 4]])
+    decision.offspring_assets = np.array([[1, 0, 0]])
+    decision.assets[4, 0] -= 1
+    world.apply_decision(batch, decision)
+
+    population = world.population
+    assert len(population) == 5
+    child = world.individuals_positions[Point(2, 2)][-1]
+    assert child.age == 0
+    assert child.assets == [Asset.get_edible(1)[0]]
+    assert len(child.dna) == population.dna_size
+    assert world.total_assets == 5
+
+
+def test_apply_decision_rejects_invalid_decisions():
+    world = make_world()
+    batch = world.get_conflict_batch()
+
+    decision = influence_batch_solver(batch)
+    decision.assets[0, 0] += 1
+    with pytest.raises(RuntimeError):
+        world.apply_decision(batch, decision)
+
+    decision = influence_batch_solver(batch)
+    decision.parents = np.array([[0, 4]])
+    decision.offspring_assets = np.zeros((1, 3))
+    with pytest.raises(RuntimeError):
+        world.apply_decision(batch, decision)
+
+    decision = influence_batch_solver(batch)
+    decision.survives = decision.survives[1:]
+    with pytest.raises(RuntimeError):
+        world.apply_decision(batch, decision)
+
+    world.apply_decision(batch, influence_batch_solver(batch))
+    with pytest.raises(RuntimeError):
+        world.apply_decision(batch, influence_batch_solver(batch))
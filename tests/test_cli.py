@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+import cli
+from cli import main, parse_args
+from metrics import read_metrics
+from snapshot import read_snapshot
+
+
+SMALL = ["--size", "10", "10", "--individuals", "20", "--assets", "50", "--seed", "0"]
+
+
+def test_defaults():
+    args = parse_args([])
+    assert args.size == (100, 100)
+    assert args.engine == "object"
+    assert args.solver == "natural"
+    assert args.print_every == 0
+
+
+def test_runs_quietly(capsys):
+    assert main(SMALL + ["--ticks", "5"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    summary = json.loads(lines[0])
+    assert summary["ticks"] == summary["tick"] == 5
+
+
+@pytest.mark.parametrize("solver", ["natural", "influence"])
+def test_metrics_and_checkpoints(tmp_path, capsys, solver):
+    metrics, checkpoint = str(tmp_path / "metrics"), str(tmp_path / "world.snap")
+    args = ["--ticks", "6", "--print-every", "2", "--engine", "vectorized"]
+    args += ["--solver", solver, "--metrics", metrics, "--checkpoint", checkpoint]
+    main(SMALL + args)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 4
+    assert read_metrics(metrics)["tick"].tolist() == list(range(6))
+    assert read_snapshot(checkpoint).tick == 6
+
+    # without --engine the resumed run keeps the snapshot's engine
+    args = ["--resume", checkpoint, "--ticks", "2", "--checkpoint", checkpoint]
+    main(args + ["--metrics", metrics])
+    summary = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert summary["tick"] == 8 or summary["total_population"] == 0
+    assert read_metrics(metrics)["tick"].tolist() == list(range(summary["tick"]))
+    assert read_snapshot(checkpoint).meta["engine"] == "vectorized"
+
+
+def test_resume_keeps_the_snapshot_world(tmp_path, capsys):
+    checkpoint = str(tmp_path / "world.snap")
+    main(SMALL + ["--ticks", "2", "--checkpoint", checkpoint])
+    args = parse_args(["--resume", checkpoint])
+    assert args.engine is None and args.size is None
+    args = ["--resume", checkpoint, "--ticks", "1", "--engine", "vectorized"]
+    main(args + ["--checkpoint", checkpoint])
+    assert read_snapshot(checkpoint).meta["engine"] == "vectorized"
+    with pytest.raises(SystemExit):
+        parse_args(["--resume", checkpoint, "--seed", "1"])
+    with pytest.raises(SystemExit):
+        parse_args(["--resume", checkpoint, "--sparse"])
+
+
+def test_failed_tick_keeps_the_last_checkpoint(tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / "world.snap")
+    solve = cli.solve
+
+    def failing_solve(world, solver):
+        if world.tick == 3:
+            raise KeyboardInterrupt
+        solve(world, solver)
+
+    monkeypatch.setattr(cli, "solve", failing_solve)
+    args = ["--ticks", "6", "--checkpoint", checkpoint, "--checkpoint-every", "2"]
+    with pytest.raises(KeyboardInterrupt):
+        main(SMALL + args)
+    assert read_snapshot(checkpoint).tick == 2
+
+
+def test_tiles(tmp_path, capsys):
+    checkpoint = str(tmp_path / "world.snap")
+    args = ["--engine", "tiled", "--tiles", "2", "1", "--ticks", "2"]
+    main(SMALL + args + ["--checkpoint", checkpoint])
+    assert parse_args(args).tiles == [2, 1]
+    assert read_snapshot(checkpoint).meta["tiles"] == [2, 1]
+
+
+def test_profile(tmp_path, capsys):
+    path = str(tmp_path / "tick.prof")
+    main(SMALL + ["--ticks", "3", "--profile"])
+    main(SMALL + ["--ticks", "3", "--profile-tick", "1", "--profile-path", path])
+    err = capsys.readouterr().err
+    assert "move_time" in err
+    assert (tmp_path / "tick.prof").exists()
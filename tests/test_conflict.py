@@ -0,0 +1,28 @@
+import numpy as np
+
+from conflict import CellGroups
+
+
+def test_groups_from_cells():
+    groups = CellGroups.from_cells(np.array([5, 3, 5, 9, 3, 3]))
+    assert groups.cells.tolist() == [3, 5, 9]
+    assert groups.offsets.tolist() == [0, 3, 5, 6]
+    assert groups.members.tolist() == [1, 4, 5, 0, 2, 3]
+    assert groups.sizes.tolist() == [3, 2, 1]
+    assert groups.members_of(1).tolist() == [0, 2]
+    assert len(groups) == 3
+
+
+def test_groups_from_no_cells():
+    groups = CellGroups.from_cells(np.zeros(0, dtype=np.int64))
+    assert len(groups) == 0
+    assert groups.offsets.tolist() == [0]
+
+
+def test_select_groups():
+    groups = CellGroups.from_cells(np.array([5, 3, 5, 9, 3, 3, 7, 7]))
+    crowded = groups.select(groups.sizes > 1)
+    assert crowded.cells.tolist() == [3, 5, 7]
+    assert crowded.offsets.tolist() == [0, 3, 5, 7]
+    assert crowded.members.tolist() == [1, 4, 5, 0, 2, 6, 7]
+    assert groups.select(np.array([2])).members.tolist() == [6, 7]
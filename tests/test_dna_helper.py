@@ -1,6 +1,16 @@
+import numpy as np
 import pytest
 
-from dna_helper import new_dna, combine_dna
+from constants import DNA_BASES
+from dna_helper import (
+    combine_codes,
+    combine_dna,
+    decode_dna,
+    DNA_PAD,
+    encode_dna,
+    new_codes,
+    new_dna,
+)
 
 
 @pytest.mark.parametrize("base,size", [("abcdefgh", 2), ("a", 9)])
@@ -15,3 +25,31 @@ def test_combine_dna(dna1, dna2):
     dna = combine_dna(dna1, dna2, len(dna1))
     assert len(dna) == len(dna1)
     assert all([b in dna1 or b in dna2 for b in dna])
+
+
+def test_new_codes():
+    codes = new_codes(50, 8)
+    assert codes.shape == (50, 8)
+    assert codes.dtype == np.uint8
+    assert codes.max() < len(DNA_BASES)
+
+
+def test_combine_codes():
+    codes1 = np.stack([encode_dna(list("ab"), 4), encode_dna(list("cccc"), 4)])
+    codes2 = np.stack([encode_dna(list("d"), 4), encode_dna(list("cc"), 4)])
+    codes = combine_codes(codes1, codes2, 4)
+    assert codes.shape == (2, 4)
+    assert set(decode_dna(codes[0])) <= set("abd")
+    assert decode_dna(codes[1]) == list("cccc")
+
+
+def test_encode_decode_dna():
+    dna = new_dna()
+    assert decode_dna(encode_dna(dna)) == dna
+    assert decode_dna(encode_dna(["a", "b"], 4)) == ["a", "b"]
+    assert encode_dna(["a", "b"], 4).tolist() == [0, 1, DNA_PAD, DNA_PAD]
+
+
+def test_encode_dna_too_long():
+    with pytest.raises(RuntimeError):
+        encode_dna(new_dna(size=5), 4)
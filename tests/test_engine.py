@@ -0,0 +1,207 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from asset import Asset, ASSET_INDEX, AssetType
+from constants import ASSET_MAX_FOR_TYPE_IN_POINT, INDIVIDUAL_MAX_AGE
+from engine import death_table, deaths
+from individual import Individual
+from point import Point
+from world import World
+
+
+def make_world() -> World:
+    world = World(
+        size=(10, 10),
+        initial_assets=0,
+        initial_individuals=0,
+        initial_populations=0,
+        engine="vectorized",
+        seed=0,
+    )
+    return world
+
+
+def test_unknown_engine_raises():
+    with pytest.raises(RuntimeError):
+        World(size=(10, 10), engine="quantum")
+
+
+def test_collect_assets_only_when_alone():
+    world = make_world()
+    engine = world._engine
+    alone, crowded1, crowded2 = Individual.get_individuals(3)
+    for individual in (alone, crowded1, crowded2):
+        for at in individual.preferences:
+            individual.preferences[at] = 1.0
+    world.individuals_positions[Point(0, 0)].append(alone)
+    world.individuals_positions[Point(5, 5)].extend([crowded1, crowded2])
+
+    world.site_positions.add([0, 55], [[1, 2, 3], [1, 2, 3]])
+    counts = world.site_positions.cells
+    engine.collect_assets()
+
+    assert len(alone.assets) == 6
+    assert len(crowded1.assets) == 0
+    assert counts[0].tolist() == [0, 0, 0]
+    assert counts[55].tolist() == [1, 2, 3]
+
+
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 1.0)
+def test_regenerate_assets_to_neighbors():
+    world = make_world()
+    world.site_positions[Point(0, 0)].add(AssetType.EDIBLE, 2)
+    world.site_positions[Point(0, 0)].add(AssetType.NON_GROWABLE, 2)
+    counts = world.site_positions.cells
+
+    world._engine.regenerate_assets()
+
+    assert counts.sum() == 6
+    assert counts[:, ASSET_INDEX[AssetType.EDIBLE]].sum() == 4
+    assert counts[[1, 10, 11]].sum() == 2
+
+
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 1.0)
+def test_regenerate_assets_fail_because_crowded():
+    world = make_world()
+    deltas = np.zeros((world._engine.num_cells, 3), dtype=int)
+    deltas[:, ASSET_INDEX[AssetType.GROWABLE]] = ASSET_MAX_FOR_TYPE_IN_POINT
+    world.site_positions.add(np.arange(world._engine.num_cells), deltas)
+    counts = world.site_positions.cells
+
+    world._engine.regenerate_assets()
+
+    assert counts.sum() == ASSET_MAX_FOR_TYPE_IN_POINT * world._engine.num_cells
+
+
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 1.0)
+def test_regenerate_assets_not_on_occupied_cells():
+    world = make_world()
+    world.individuals_positions[Point(0, 0)].append(Individual.make_from_atoms())
+    world.site_positions[Point(0, 0)].add(AssetType.GROWABLE)
+    counts = world.site_positions.cells
+
+    world._engine.regenerate_assets()
+
+    assert counts.sum() == 1
+
+
+@pytest.mark.parametrize("age, survive", [(1, True), (INDIVIDUAL_MAX_AGE, False)])
+@patch("engine.INDIVIDUAL_DEATH_PROBABILITY", 0.0)
+def test_age_individuals(age, survive):
+    world = make_world()
+    individual = Individual.make_from_atoms()
+    individual.age = age
+    individual.grant_many_assets(Asset.get_edible(3) + Asset.get_non_growable(2))
+    world.individuals_positions[Point(0, 0)].append(individual)
+    counts = world.site_positions.cells
+
+    world._engine.age_individuals()
+
+    assert individual.age == age + 1
+    assert individual.starving_days == 0
+    assert len(individual.assets) == 4
+    if survive:
+        assert len(world.population) == 1
+        assert counts.sum() == 0
+    else:
+        assert len(world.population) == 0
+        assert counts[0].tolist() == [2, 0, 2]
+
+
+def test_age_individuals_starving():
+    world = make_world()
+    individual = Individual.make_from_atoms()
+    individual.starving_days = 3
+    world.individuals_positions[Point(0, 0)].append(individual)
+    world.rng.generator = np.random.default_rng(1)
+
+    world._engine.age_individuals()
+
+    assert individual.starving_days == 4
+
+
+def test_death_table():
+    table = death_table(0.01, 0.05, INDIVIDUAL_MAX_AGE)
+    days = np.arange(10)
+    assert np.allclose(table[:10], 0.01 + 1.05**days - 1)
+    assert table[-1] == 1.0
+    assert np.all(np.diff(table) >= 0)
+    assert not table.flags.writeable
+
+
+@patch("engine.INDIVIDUAL_DEATH_PROBABILITY", 0.01)
+@patch("engine.INDIVIDUAL_DAILY_STARVATION_PROBABILITY", 0.05)
+def test_deaths_follow_starvation_streaks():
+    starving_days = np.array([0, 0, 15, 1000, 2])
+    age = np.array([1, INDIVIDUAL_MAX_AGE + 1, 20, 20, 5])
+    uniforms = np.array([0.5, 0.5, 0.99, 0.999, 0.2])
+    assert deaths(age, starving_days, uniforms).tolist() == [
+        False,
+        True,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_update_influences_matches_reference():
+    world = make_world()
+    individuals = Individual.get_individuals(5)
+    for i, individual in enumerate(individuals):
+        individual.age = i + 1
+        individual.grant_many_assets(Asset.get_assets(10 * (i + 1)))
+    world.individuals_positions[Point(0, 0)].extend(individuals)
+    world.site_positions[Point(1, 1)].extend(Asset.get_assets(20))
+
+    world._engine.update_influences()
+
+    avg_dna = Individual.avg_dna_counts(individuals)
+    world_wealth = float(20 + 10 + 20 + 30 + 40 + 50)
+    for individual in individuals:
+        assert individual.influence == pytest.approx(
+            (1.0 / individual.dna_distance(avg_dna))
+            * individual.age
+            / INDIVIDUAL_MAX_AGE
+            * len(individual.assets)
+            / world_wealth
+        )
+
+
+def test_update_influences_no_wealth():
+    world = make_world()
+    world.individuals_positions[Point(0, 0)].extend(Individual.get_individuals(2))
+    world._engine.update_influences()
+    assert world.population.influence.tolist() == [1.0, 1.0]
+
+
+def test_move_individuals():
+    world = make_world()
+    corner, center = Individual.get_individuals(2)
+
+    for _ in range(20):
+        world.individuals_positions[Point(0, 0)].append(corner)
+        world.individuals_positions[Point(5, 5)].append(center)
+        world._engine.move_individuals()
+        x, y = world.population.x.tolist(), world.population.y.tolist()
+        assert (x[0], y[0]) in ((0, 1), (1, 0), (1, 1))
+        assert max(abs(x[1] - 5), abs(y[1] - 5)) == 1
+
+
+def test_move_time_keeps_sites():
+    world = World(
+        size=(10, 10),
+        initial_assets=50,
+        initial_individuals=20,
+        initial_populations=3,
+        engine="vectorized",
+    )
+    for _ in range(5):
+        world.move_time()
+        assert world.total_assets >= 0
+        for point, site in world.site_positions.items():
+            assert world.is_valid_point(point)
+            assert len(site) > 0
+        for point in world.individuals_positions:
+            assert world.is_valid_point(point)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from ensemble import EnsembleStats, FIELDS, run_ensemble, run_replica
+from world_helper import natural_solver
+
+
+WORLD = dict(
+    size=(10, 10), initial_assets=50, initial_individuals=20, initial_populations=3
+)
+
+
+def test_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    trajectories = rng.uniform(1, 10, (20, 5, len(FIELDS)))
+    stats = EnsembleStats(5)
+    for trajectory in trajectories:
+        stats.add(trajectory)
+    assert stats.replicas == 20
+    assert np.allclose(stats.mean, trajectories.mean(axis=0))
+    assert np.allclose(stats.std, trajectories.std(axis=0, ddof=1))
+    mean, lower, upper = stats.band("avg_age")
+    error = 1.96 * trajectories[:, :, 2].std(axis=0, ddof=1) / np.sqrt(20)
+    assert np.allclose(upper - mean, error)
+    assert np.allclose(mean - lower, error)
+    assert stats.extinct.tolist() == [0] * 5
+
+
+def test_stats_of_extinct_replicas():
+    stats = EnsembleStats(4)
+    stats.add(np.array([[4, 1.0, 2.0], [2, 3.0, 4.0], [0, 0.0, 0.0]]))
+    stats.add(np.array([[6, 3.0, 4.0], [4, 5.0, 6.0], [2, 1.0, 2.0], [2, 1.0, 3.0]]))
+    assert stats.extinct.tolist() == [0, 0, 1, 1]
+    assert stats.mean[:, 0].tolist() == [5, 3, 1, 1]
+    assert stats.count[:, 2].tolist() == [2, 2, 1, 1]
+    assert stats.mean[:, 2].tolist() == [3, 5, 2, 3]
+
+
+def test_run_replica_stops_on_extinction():
+    trajectory = run_replica(3, 500, WORLD, natural_solver)
+    assert trajectory.shape[1] == len(FIELDS)
+    assert trajectory[0, 0] > 0
+    if len(trajectory) < 500:
+        assert trajectory[-1, 0] == 0
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_run_ensemble(processes):
+    stats = run_ensemble(6, 15, seed=1, processes=processes, **WORLD)
+    assert stats.replicas == 6
+    assert stats.count[:, 0].tolist() == [6] * 15
+    assert (stats.mean[:, 0] >= 0).all()
+    reference = run_ensemble(6, 15, seed=1, processes=1, **WORLD)
+    assert np.allclose(stats.mean, reference.mean)
+    assert np.allclose(stats.m2, reference.m2)
@@ -2,12 +2,13 @@ from math import ceil, log10
 from collections import Counter
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from asset import Asset, ASSET_NUM, ASSET_TYPES, AssetType
 from asset_site import AssetSite
 from constants import *
-from individual import Individual
+from individual import Individual, nursery
 
 
 def assert_valid_individual(individual: Individual) -> None:
@@ -22,6 +23,15 @@ def assert_valid_individual(individual: Individual) -> None:
         assert PREFERENCE_MIN_VALUE <= p <= PREFERENCE_MAX_VALUE
 
 
+def test_newborns_share_the_nursery():
+    parent1, parent2 = Individual.get_individuals(2)
+    children = [Individual.make_from_parents(parent1, parent2) for _ in range(3)]
+    population = nursery()
+    assert all(child._population is population for child in children)
+    assert parent1._population is population
+    assert len({population.index_of(child) for child in children}) == 3
+
+
 def test_make_from_atoms():
     individual = Individual.make_from_atoms()
     assert_valid_individual(individual)
@@ -45,6 +55,16 @@ def test_make_from_parents():
         assert p3 == pytest.approx((p1 + p2) / 2, abs=PREFERENCE_RANDOMNESS_DELTA)
 
 
+def test_make_from_parents_samples_parent_bases():
+    parent1 = Individual.make_from_atoms()
+    parent2 = Individual.make_from_atoms()
+    parent1.dna, parent2.dna = ["a"] * 3, ["b"] * 2
+    individual = Individual.make_from_parents(parent1=parent1, parent2=parent2)
+    assert len(individual.dna) == DNA_SIZE
+    assert set(individual.dna) <= {"a", "b"}
+    assert individual.dna_codes.dtype == np.uint8
+
+
 def test_get_individuals():
     individuals = Individual.get_individuals(size=20)
     assert len(individuals) == 20
@@ -134,6 +154,47 @@ def test_inherit():
     assert len(parent1.assets) + len(parent2.assets) + len(child.assets) == 100
 
 
+def test_leave_heritage_splits_counts():
+    individual = Individual.make_from_atoms()
+    individual.grant_many_assets(Asset.get_edible(7) + Asset.get_growable(4))
+
+    heritage = individual.leave_heritage()
+
+    assert len(heritage) == 5
+    assert len(individual.assets) == 6
+    for at in ASSET_TYPES:
+        assert heritage.total_of_type(at) + individual.total_of_type(at) == (
+            {AssetType.EDIBLE: 7, AssetType.GROWABLE: 4}.get(at, 0)
+        )
+
+
+def test_consume():
+    individual = Individual.make_from_atoms()
+    individual.grant_asset(Asset(AssetType.EDIBLE))
+    assert individual.consume(AssetType.EDIBLE)
+    assert not individual.consume(AssetType.EDIBLE)
+    assert len(individual.assets) == 0
+
+
+def test_happiness_follows_inventory():
+    individual = Individual.make_from_atoms()
+    individual.preferences = {at: 0.5 for at in ASSET_TYPES}
+    individual.grant_many_assets(Asset.get_edible(4))
+    individual.preferences[AssetType.EDIBLE] = 1.0
+    individual.revoke(AssetType.EDIBLE)
+    assert individual.happiness == pytest.approx(3.0 * INDIVIDUAL_HAPPINESS_UNIT)
+
+
+def test_preferred_asset_type():
+    individual = Individual.make_from_atoms()
+    individual.preferences = {
+        AssetType.EDIBLE: 0.2,
+        AssetType.GROWABLE: 0.7,
+        AssetType.NON_GROWABLE: 0.7,
+    }
+    assert individual.preferred_asset_type == AssetType.GROWABLE
+
+
 @pytest.mark.parametrize(
     "age, starving_days, has_food, estimate, units, is_alive",
     [
@@ -226,6 +287,7 @@ def test_fight(influence1, influence2, draw, survivor_index):
         assert len(result) == 1
         assert result[0] == individuals[survivor_index]
         assert len(result[0].assets) == 100
+        assert len(individuals[1 - survivor_index].assets) == 0
 
 
 def test_reproduce_with():
@@ -0,0 +1,106 @@
+import numpy as np
+
+from asset import Asset
+from individual import Individual
+from metrics import FIELDS, MetricsWriter, read_metrics
+from point import Point
+from world import World
+
+
+def make_world() -> World:
+    return World(
+        size=(10, 10),
+        initial_assets=0,
+        initial_individuals=0,
+        initial_populations=0,
+        seed=0,
+    )
+
+
+def test_metrics_round_trip(tmp_path):
+    path = str(tmp_path / "metrics")
+    world = make_world()
+    world.site_positions[Point(1, 1)].extend(Asset.get_edible(4))
+    with MetricsWriter(world, path, block_size=2) as writer:
+        writer.record()
+        world.individuals_positions[Point(2, 2)].extend(Individual.get_individuals(3))
+        world.tick += 1
+        writer.record()
+        positions = world.individuals_positions
+        positions[Point(2, 2)] = positions[Point(2, 2)][1:]
+        world.tick += 1
+        writer.record()
+        assert len(read_metrics(path)["tick"]) == 2
+
+    metrics = read_metrics(path)
+    assert sorted(metrics) == sorted(name for name, _ in FIELDS)
+    assert isinstance(metrics["tick"], np.memmap)
+    assert metrics["tick"].tolist() == [0, 1, 2]
+    assert metrics["population"].tolist() == [0, 3, 2]
+    assert metrics["births"].tolist() == [0, 3, 0]
+    assert metrics["deaths"].tolist() == [0, 0, 1]
+    assert metrics["conflicts"].tolist() == [0, 1, 1]
+    assert metrics["assets_edible"].tolist() == [4, 4, 4]
+    assert metrics["assets_growable"].tolist() == [0, 0, 0]
+
+
+def test_conflicts_are_counted_before_solving(tmp_path):
+    world = make_world()
+    world.individuals_positions[Point(2, 2)].extend(Individual.get_individuals(2))
+    world.individuals_positions[Point(3, 3)].extend(Individual.get_individuals(2))
+    with MetricsWriter(world, str(tmp_path / "metrics")) as writer:
+        conflicts = world.get_conflicts()
+        for conflict in conflicts:
+            conflict.individuals = conflict.individuals[:1]
+        world.solve_conflicts(conflicts)
+        assert len(world.get_conflicts()) == 0
+        writer.record()
+    metrics = read_metrics(str(tmp_path / "metrics"))
+    assert metrics["conflicts"].tolist() == [2]
+    assert metrics["deaths"].tolist() == [2]
+    assert metrics["births"].tolist() == [0]
+
+
+def test_metrics_follow_a_run(tmp_path):
+    path = str(tmp_path / "metrics")
+    world = World(size=(20, 20), initial_individuals=50, seed=1, engine="vectorized")
+    with MetricsWriter(world, path) as writer:
+        for _ in range(5):
+            world.move_time()
+            writer.record()
+    metrics = read_metrics(path)
+    assert metrics["tick"].tolist() == [1, 2, 3, 4, 5]
+    assert metrics["population"][-1] == len(world.population)
+    assert 50 - metrics["deaths"].sum() + metrics["births"].sum() == len(
+        world.population
+    )
+    assert metrics["avg_age"][-1] == world.indicators["avg_age"]
+
+
+def test_read_metrics_ignores_partial_rows(tmp_path):
+    path = str(tmp_path / "metrics")
+    with MetricsWriter(make_world(), path) as writer:
+        writer.record()
+        writer.record()
+    with open(str(tmp_path / "metrics" / "births.bin"), "ab") as f:
+        f.write(b"\x00" * 12)
+    metrics = read_metrics(path)
+    assert len(metrics["births"]) == 2
+
+
+def test_append_drops_rows_after_the_resumed_tick(tmp_path):
+    path = str(tmp_path / "metrics")
+    world = make_world()
+    with MetricsWriter(world, path) as writer:
+        for _ in range(4):
+            writer.record()
+            world.tick += 1
+    with open(str(tmp_path / "metrics" / "deaths.bin"), "ab") as f:
+        f.write(b"\x00" * 8)
+
+    world.tick = 2
+    with MetricsWriter(world, path, append=True) as writer:
+        writer.record()
+    metrics = read_metrics(path)
+    assert metrics["tick"].tolist() == [0, 1, 2]
+    assert len(metrics["deaths"]) == 3
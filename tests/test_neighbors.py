@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from neighbors import NeighborTable
+from point import Point
+
+
+def brute_force(size, x, y):
+    return {
+        (x + dx, y + dy)
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+        if (dx, dy) != (0, 0) and 0 <= x + dx < size[0] and 0 <= y + dy < size[1]
+    }
+
+
+@pytest.mark.parametrize("size", [(10, 10), (2, 7), (1, 4), (5, 1)])
+def test_table_matches_brute_force(size):
+    table = NeighborTable(size)
+    x, y = map(np.ravel, np.indices(size))
+    borders = table.borders(x, y)
+    for cx, cy, border in zip(x.tolist(), y.tolist(), borders.tolist()):
+        offsets = table.offsets[border, : table.counts[border]]
+        assert {(cx + dx, cy + dy) for dx, dy in offsets.tolist()} == brute_force(
+            size, cx, cy
+        )
+
+
+def test_sample_covers_every_neighbor():
+    table = NeighborTable((10, 10))
+    n = 4000
+    x, y = table.sample(np.zeros(n, int), np.full(n, 5), np.random.rand(n))
+    assert set(zip(x.tolist(), y.tolist())) == brute_force((10, 10), 0, 5)
+
+
+def test_single_cell_stays_put():
+    table = NeighborTable((1, 1))
+    assert table.neighbor(Point(0, 0), 0.5) == Point(0, 0)
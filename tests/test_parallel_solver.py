@@ -0,0 +1,117 @@
+import pickle
+
+import pytest
+
+from asset import Asset
+from asset_site import AssetSite
+from conflict import Conflict
+from individual import Individual, nursery
+from parallel_solver import ParallelSolver
+from point import Point
+from world import World
+
+
+def run(executor: str, workers: int, seed: int = 11):
+    world = World(
+        size=(10, 10),
+        initial_assets=200,
+        initial_individuals=60,
+        initial_populations=2,
+        seed=seed,
+    )
+    history = []
+    with ParallelSolver(executor=executor, workers=workers, chunk_size=4) as solver:
+        for _ in range(5):
+            world.solve_conflicts(solver(world.get_conflicts(), world.rng))
+            history.append((world.indicators, world.asset_ledger))
+            world.move_time()
+    return history
+
+
+def test_individual_pickles_as_detached_copy():
+    individual = Individual.make_from_atoms()
+    individual.grant_many_assets(Asset.get_assets(5))
+    world = World(
+        size=(5, 5), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    world.individuals_positions[Point(1, 1)].append(individual)
+
+    copy = pickle.loads(pickle.dumps(individual))
+
+    assert copy is not individual
+    assert copy.dna == individual.dna
+    assert copy.assets == individual.assets
+    assert len(copy._population) == 1
+    copy.age = 30
+    assert individual.age == 0
+
+
+def test_chunks_keep_order():
+    solver = ParallelSolver(chunk_size=5)
+    conflicts = [
+        Conflict(Point(i, 0), Individual.get_individuals(2), AssetSite())
+        for i in range(7)
+    ]
+    chunks = solver.chunk(conflicts)
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    assert [c for chunk in chunks for c in chunk] == conflicts
+
+
+def test_unknown_executor_raises():
+    with pytest.raises(RuntimeError):
+        ParallelSolver(executor="cluster")
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_deterministic_across_workers(executor):
+    assert run(executor, workers=1) == run(executor, workers=3)
+
+
+def test_solutions_apply_to_world():
+    world = World(
+        size=(4, 4),
+        initial_assets=100,
+        initial_individuals=40,
+        initial_populations=1,
+        seed=5,
+        debug=True,
+    )
+    with ParallelSolver(executor="process", workers=2, chunk_size=2) as solver:
+        solutions = solver(world.get_conflicts(), world.rng)
+    world.solve_conflicts(solutions)
+
+    assert [s.place for s in solutions] == sorted(
+        [s.place for s in solutions], key=lambda p: (p.x, p.y)
+    )
+    assert len(world.population) == sum(map(len, world.individuals_positions.values()))
+    assert world.total_assets == sum(world.asset_ledger["site"].values()) + sum(
+        world.asset_ledger["inventory"].values()
+    )
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_survivors_stay_in_place(executor):
+    world = World(
+        size=(4, 4),
+        initial_assets=100,
+        initial_individuals=40,
+        initial_populations=1,
+        seed=5,
+    )
+    conflicts = world.get_conflicts()
+    members = {id(i) for c in conflicts for i in c.individuals}
+    with ParallelSolver(executor=executor, workers=2, chunk_size=4) as solver:
+        solutions = solver(conflicts, world.rng)
+    for solution in solutions:
+        for individual in solution.individuals:
+            if id(individual) in members:
+                assert individual._population is world.population
+            else:
+                assert individual._population is nursery()
+    births = world.births
+    world.solve_conflicts(solutions)
+    newborns = sum(
+        len(s.individuals) - sum(id(i) in members for i in s.individuals)
+        for s in solutions
+    )
+    assert world.births - births == newborns
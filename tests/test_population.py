@@ -0,0 +1,279 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from asset import Asset, ASSET_INDEX, AssetType
+from dna_helper import DNA_PAD, encode_dna, new_dna
+from individual import Individual
+from population import Population
+from shared_state import SharedAllocator, SharedAttachments
+
+
+def add_individual(population: Population, x: int = 0, y: int = 0) -> int:
+    return population.add(
+        dna=encode_dna(new_dna()), preferences=[0.1, 0.5, 0.9], x=x, y=y
+    )
+
+
+def test_add():
+    population = Population()
+    for i in range(20):
+        assert add_individual(population, x=i, y=2 * i) == i
+    assert len(population) == 20
+    assert population.x.tolist() == list(range(20))
+    assert population.y.tolist() == list(range(0, 40, 2))
+    assert population.assets.sum() == 0
+    assert population.preferences[0].tolist() == [0.1, 0.5, 0.9]
+
+
+def test_add_dna_too_long():
+    population = Population(dna_size=4)
+    with pytest.raises(RuntimeError):
+        population.add(dna=encode_dna(new_dna(size=5), size=5), preferences=[0.5] * 3)
+
+
+def test_take():
+    population = Population()
+    for i in range(5):
+        add_individual(population, x=i)
+    taken = population.take([1, 3])
+    assert len(taken) == 2
+    assert taken.x.tolist() == [1, 3]
+    assert len(population) == 5
+
+
+def test_remove_compacts_columns():
+    population = Population()
+    for i in range(5):
+        add_individual(population, x=i)
+    population.remove([0, 2])
+    assert len(population) == 3
+    assert population.x.tolist() == [1, 3, 4]
+
+
+def test_remove_rebinds_views():
+    population = Population()
+    for i in range(5):
+        add_individual(population, x=i)
+    views = [Individual.from_population(population, i) for i in range(5)]
+    views[4].age = 7
+    views[2].age = 3
+
+    population.remove([0, 2])
+
+    assert population.index_of(views[4]) == 2
+    assert views[4].age == 7
+    assert Individual.from_population(population, 2) is views[4]
+    assert population.index_of(views[2]) is None
+    assert views[2].age == 3
+
+
+def test_remove_rebinds_views_out_of_order():
+    population = Population()
+    for i in range(8):
+        add_individual(population, x=i)
+    views = {i: Individual.from_population(population, i) for i in (7, 1, 5, 3, 6)}
+    for i, view in views.items():
+        view.age = i
+
+    population.remove([0, 3, 4])
+
+    assert sorted(population._views) == [0, 2, 3, 4]
+    for i in (1, 5, 6, 7):
+        assert population._views[population.index_of(views[i])] is views[i]
+        assert views[i].age == i
+    assert population.index_of(views[3]) is None
+    assert views[3].age == 3
+
+
+def test_adopt():
+    population = Population()
+    add_individual(population)
+    individual = Individual.make_from_atoms()
+    individual.grant_asset(Asset(AssetType.EDIBLE))
+
+    index = population.adopt(individual, 4, 5)
+
+    assert index == 1
+    assert population.index_of(individual) == 1
+    assert len(population) == 2
+    assert (population.x[1], population.y[1]) == (4, 5)
+    assert population.assets[1, ASSET_INDEX[AssetType.EDIBLE]] == 1
+    individual.age = 10
+    assert population.age[1] == 10
+
+
+def test_adopt_many_takes_rows_from_each_source():
+    population, other = Population(), Population()
+    add_individual(population)
+    for i in range(3):
+        add_individual(other, x=i)
+    views = [Individual.from_population(other, i) for i in (2, 0)]
+    views.append(Individual.make_from_atoms())
+    views[0].age = 7
+
+    indices = population.adopt_many(views, [1, 2, 3], 9)
+
+    assert indices.tolist() == [1, 2, 3]
+    assert [population.index_of(view) for view in views] == [1, 2, 3]
+    assert population.age[1] == 7
+    assert population.y.tolist() == [0, 9, 9, 9]
+    assert len(other) == 1 and other.x.tolist() == [1]
+
+
+def test_prune_drops_rows_without_views():
+    population = Population()
+    for i in range(4):
+        add_individual(population, x=i)
+    view = Individual.from_population(population, 2)
+    population.prune(slack=3)
+    assert len(population) == 4
+    population.prune()
+    assert population.x.tolist() == [2]
+    assert population.index_of(view) == 0
+
+
+def test_move_changes_version():
+    population = Population()
+    add_individual(population)
+    version = population.version
+    population.move(0, 3, 4)
+    assert population.version > version
+    assert (population.x[0], population.y[0]) == (3, 4)
+
+
+def test_grows_capacity():
+    population = Population(capacity=1)
+    for _ in range(100):
+        add_individual(population)
+    assert len(population) == 100
+    assert np.all(population.dna < 26)
+
+
+def test_dna_distances_match_reference():
+    population = Population()
+    for _ in range(10):
+        add_individual(population)
+    individuals = [Individual.from_population(population, i) for i in range(10)]
+    avg_dna = Individual.avg_dna_counts(individuals)
+
+    distances = population.dna_distances()
+
+    for individual, distance in zip(individuals, distances):
+        assert distance == pytest.approx(individual.dna_distance(avg_dna))
+
+
+def test_dna_distances_exactly_zero_for_clones():
+    population = Population()
+    dna = encode_dna(new_dna())
+    for _ in range(3):
+        population.add(dna=dna, preferences=[0.1, 0.5, 0.9])
+    assert population.dna_distances().tolist() == [0.0, 0.0, 0.0]
+
+
+def test_bases_follow_changes():
+    population = Population()
+    for _ in range(6):
+        add_individual(population)
+    Individual.from_population(population, 2).dna = ["a"] * 26
+    population.remove([0, 4])
+    population.take([0])
+    other = Population()
+    other.adopt(Individual.from_population(population, 1), 0, 0)
+
+    assert (len(population), len(other)) == (3, 1)
+    for p in (population, other):
+        assert p.bases.sum(axis=1).tolist() == [26] * len(p)
+        assert p.bases_mean.tolist() == pytest.approx(p.bases.mean(axis=0).tolist())
+    assert other.bases[0].tolist() == [26] + [0] * 25
+
+
+def test_aggregates_follow_changes():
+    population = Population()
+    for _ in range(4):
+        add_individual(population)
+    population.set_age(slice(None), [1, 2, 3, 4])
+    population.change_assets([0, 2], [[1, 0, 0], [0, 2, 0]])
+    population.set_preferences(2, [0.0, 1.0, 0.0])
+    population.change_assets((1, 2), 3)
+    population.remove([0])
+    population.take([0])
+
+    assert population.age_total == 9
+    assert population.assets_total.tolist() == [0, 2, 3]
+    assert population.happiness_total == pytest.approx(2.0 + 3 * 0.9)
+
+
+def test_columns_are_read_only():
+    population = Population()
+    add_individual(population)
+    with pytest.raises(ValueError):
+        population.assets[0] += 1
+
+
+def test_add_many():
+    population = Population()
+    add_individual(population)
+    dna = np.array([[0, 1, 1], [2, 2, 2]], dtype=np.uint8)
+    indices = population.add_many(dna, [[0.1, 0.5, 0.9]] * 2, [3, 4], [5, 6])
+
+    assert indices.tolist() == [1, 2]
+    assert len(population) == 3
+    assert population.x.tolist()[1:] == [3, 4]
+    assert population.bases[1, :3].tolist() == [1, 2, 0]
+    assert population.dna[2, 3] == DNA_PAD
+    assert population.bases_mean.sum() == pytest.approx((26 + 3 + 3) / 3)
+
+
+def test_shared_columns_survive_growth():
+    allocator = SharedAllocator()
+    population = Population(allocator=allocator)
+    for i in range(40):
+        add_individual(population, x=i)
+    spec = population.shared_spec()
+    x = SharedAttachments().attach(spec["x"])
+    assert x[:40].tolist() == list(range(40))
+    assert pickle.loads(pickle.dumps(population)).x.tolist() == list(range(40))
+    allocator.close()
+
+
+def test_recount():
+    population = Population()
+    for i in range(3):
+        add_individual(population)
+    population._columns["assets"][:3] = 2
+    population._columns["age"][:3] = 5
+    population.recount()
+    assert population.age_total == 15
+    assert population.assets_total.tolist() == [6, 6, 6]
+    assert population.happiness_total == pytest.approx(3 * 2 * 1.5)
+
+
+def test_append_columns():
+    population = Population()
+    for i in range(3):
+        add_individual(population, x=i)
+    population.change_assets(1, [1, 2, 3])
+    copy = Population()
+    assert copy.append_columns(population.columns).tolist() == [0, 1, 2]
+    assert copy.x.tolist() == [0, 1, 2]
+    assert copy.assets_total.tolist() == [1, 2, 3]
+    assert copy.bases_mean.tolist() == population.bases_mean.tolist()
+    with pytest.raises(RuntimeError):
+        Population(dna_size=4).append_columns(population.columns)
+
+
+def test_assign_rows():
+    population, other = Population(), Population()
+    for i in range(3):
+        add_individual(population, x=i)
+        add_individual(other, x=i)
+    other.change_assets(2, [1, 1, 1])
+    view = population.get_view(0)
+    version = population.version
+    population.assign_rows([1], other, [2])
+    assert population.assets[1].tolist() == [1, 1, 1]
+    assert population.assets_total.tolist() == [1, 1, 1]
+    assert population.version == version
+    assert population.get_view(0) is view
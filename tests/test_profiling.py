@@ -0,0 +1,65 @@
+import pstats
+
+import pytest
+
+from world import World
+from world_helper import natural_solver
+
+
+def run(world: World, ticks: int) -> None:
+    for _ in range(ticks):
+        world.solve_conflicts(natural_solver(world.get_conflicts(), world.rng))
+        world.move_time()
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized"])
+def test_phases_are_timed_per_tick(engine):
+    world = World(size=(20, 20), initial_individuals=50, seed=0, engine=engine)
+    profiler = world.enable_profiling()
+    run(world, 3)
+    stats = profiler.stats()
+    assert set(stats) == {
+        "get_conflicts",
+        "solve_conflicts",
+        "move_time",
+        "collect_assets",
+        "regenerate_assets",
+        "age_individuals",
+        "update_influences",
+        "move_individuals",
+    }
+    assert all(phase.ticks == 3 for phase in stats.values())
+    move_time = stats["move_time"]
+    assert 0 < move_time.min <= move_time.mean <= move_time.max
+    assert stats["collect_assets"].total <= move_time.total
+    edges, counts = profiler.histogram("move_time")
+    assert len(edges) == len(counts) + 1
+    assert counts.sum() == 3
+
+
+def test_disabled_profiling_restores_the_world():
+    world = World(size=(20, 20), initial_individuals=50, seed=0)
+    profiler = world.enable_profiling()
+    assert "move_time" in vars(world)
+    world.disable_profiling()
+    assert world.profiler is None
+    assert "move_time" not in vars(world)
+    assert "_collect_assets" not in vars(world)
+    run(world, 1)
+    assert profiler.stats() == {}
+    profiler = world.enable_profiling()
+    with pytest.raises(RuntimeError):
+        profiler.attach(World(size=(5, 5), initial_individuals=0))
+
+
+def test_profile_one_tick(tmp_path):
+    path = str(tmp_path / "tick.prof")
+    world = World(size=(20, 20), initial_individuals=50, seed=0, engine="vectorized")
+    world.enable_profiling(profile_tick=1, profile_path=path)
+    run(world, 1)
+    with pytest.raises(FileNotFoundError):
+        pstats.Stats(path)
+    run(world, 2)
+    functions = {name for _, _, name in pstats.Stats(path).stats}
+    assert "collect_assets" in functions
+    assert "get_conflicts" in functions
@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+
+from rng import SimulationRNG, fallback_generator
+
+
+def test_same_seed_same_draws():
+    rng1, rng2 = SimulationRNG(7), SimulationRNG(7)
+    draws1 = [rng1.random() for _ in range(10)] + rng1.integers(8, 10).tolist()
+    draws2 = [rng2.random() for _ in range(10)] + rng2.integers(8, 10).tolist()
+    assert draws1 == draws2
+
+
+def test_blocks_are_refilled():
+    rng = SimulationRNG(0, block_size=4)
+    draws = [rng.random() for _ in range(10)]
+    assert len(set(draws)) == 10
+    assert all(0 <= d < 1 for d in draws)
+
+
+def test_sequence_helpers():
+    rng = SimulationRNG(0)
+    items = list("abcdef")
+    assert set(rng.choices(items, k=20)) <= set(items)
+    assert len(set(rng.sample(items, k=6))) == 6
+    rng.shuffle(items)
+    assert sorted(items) == list("abcdef")
+
+
+def test_vector_draws():
+    rng = SimulationRNG(0)
+    assert rng.uniforms(5).shape == (5,)
+    assert np.all(rng.integers(3, 100) < 3)
+
+
+def test_state_round_trip():
+    rng = SimulationRNG(3, block_size=8)
+    rng.random(), rng.random()
+    copy = SimulationRNG(None, block_size=8)
+    copy.set_state(rng.get_state())
+    assert [rng.random() for _ in range(20)] == [copy.random() for _ in range(20)]
+    assert rng.uniforms(4).tolist() == copy.uniforms(4).tolist()
+
+
+def test_fallback_follows_the_random_module():
+    random.seed(5)
+    draws1 = fallback_generator().random(3).tolist()
+    random.seed(5)
+    assert fallback_generator().random(3).tolist() == draws1
@@ -0,0 +1,81 @@
+import subprocess
+import sys
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from shared_state import SharedAllocator, SharedAttachments
+
+
+def fill(spec, value) -> None:
+    attachments = SharedAttachments()
+    attachments.attach(spec)[...] = value
+    attachments.close()
+
+
+def test_worker_writes_are_visible():
+    allocator = SharedAllocator()
+    array = allocator.empty((4, 3), np.int64)
+    array[...] = 0
+    process = get_context().Process(target=fill, args=(allocator.spec(array), 7))
+    process.start()
+    process.join()
+    allocator.close()
+    assert process.exitcode == 0
+    assert np.all(array == 7)
+
+
+def test_attachments_follow_reallocated_segments():
+    allocator = SharedAllocator()
+    attachments = SharedAttachments()
+    old = allocator.empty((2,), np.float64)
+    old[...] = 1
+    assert attachments.attach_all({"a": allocator.spec(old)})["a"].sum() == 2
+    new = allocator.empty((3,), np.float64)
+    new[...] = 2
+    allocator.release(old)
+    arrays = attachments.attach_all({"a": allocator.spec(new)})
+    allocator.close()
+    assert arrays["a"].tolist() == [2, 2, 2]
+
+
+def test_views_outlive_release():
+    allocator = SharedAllocator()
+    array = allocator.empty((5,), np.int32)
+    array[...] = 3
+    view = array[1:]
+    allocator.release(array)
+    del array
+    assert view.sum() == 12
+
+
+def test_spec_of_private_array_raises():
+    with pytest.raises(RuntimeError):
+        SharedAllocator().spec(np.zeros(3))
+
+
+def test_outside_process_does_not_destroy_segments():
+    allocator = SharedAllocator()
+    array = allocator.empty((3,), np.int64)
+    array[...] = 1
+    script = (
+        "import sys; sys.path.insert(0, 'src')\n"
+        "from shared_state import SharedAttachments\n"
+        f"SharedAttachments().attach({allocator.spec(array)!r})[...] = 5\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True)
+    assert result.returncode == 0
+    assert b"leaked" not in result.stderr
+    assert array.tolist() == [5, 5, 5]
+    assert SharedAttachments().attach(allocator.spec(array)).tolist() == [5, 5, 5]
+    allocator.close()
+    allocator.close()
+
+
+def test_close_tolerates_unlinked_segments():
+    allocator = SharedAllocator()
+    array = allocator.empty((2,), np.int32)
+    SharedMemory(name=allocator.spec(array)[0]).unlink()
+    allocator.close()
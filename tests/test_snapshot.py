@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from snapshot import load_snapshot, read_snapshot, save_snapshot
+from world import World
+
+
+def assert_same_world(world1: World, world2: World) -> None:
+    assert world1.tick == world2.tick
+    assert world1.size == world2.size
+    columns = world2.population.columns
+    for name, column in world1.population.columns.items():
+        assert np.array_equal(column, columns[name]), name
+    assert np.array_equal(
+        world1.site_positions.occupied()[1], world2.site_positions.occupied()[1]
+    )
+    assert world1.site_positions.total == world2.site_positions.total
+    assert world1.indicators == world2.indicators
+
+
+@pytest.mark.parametrize(
+    "engine,sparse", [("object", False), ("vectorized", False), ("object", True)]
+)
+def test_snapshot_resumes_the_same_run(tmp_path, engine, sparse):
+    path = str(tmp_path / "world.snap")
+    world = World(
+        size=(30, 30),
+        initial_individuals=100,
+        initial_assets=500,
+        seed=4,
+        engine=engine,
+        sparse=sparse,
+    )
+    # by tick 5 the running happiness total has drifted from a fresh sum
+    for _ in range(5):
+        world.move_time()
+    save_snapshot(world, path)
+    resumed = load_snapshot(path, debug=True)
+    assert resumed.engine == engine and resumed.sparse == sparse
+    assert_same_world(world, resumed)
+    for _ in range(3):
+        world.move_time()
+        resumed.move_time()
+    assert_same_world(world, resumed)
+    assert resumed.tick == 8
+
+
+def test_snapshot_is_memory_mapped(tmp_path):
+    path = str(tmp_path / "world.snap")
+    world = World(size=(10, 20), initial_individuals=10, seed=0)
+    save_snapshot(world, path)
+    snapshot = read_snapshot(path)
+    assert snapshot.size == (10, 20)
+    assert snapshot.tick == 0
+    assert isinstance(snapshot.arrays["dna"].base, np.memmap)
+    assert snapshot.arrays["dna"].dtype == np.uint8
+    assert np.array_equal(snapshot.arrays["age"], world.population.age)
+    assert all(
+        array.ctypes.data % array.dtype.itemsize == 0
+        for array in snapshot.arrays.values()
+    )
+
+
+def test_read_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "world.snap"
+    path.write_bytes(b"not a snapshot at all, really")
+    with pytest.raises(RuntimeError):
+        read_snapshot(str(path))
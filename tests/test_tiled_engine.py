@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from asset import ASSET_INDEX, AssetType
+from constants import ASSET_MAX_FOR_TYPE_IN_POINT
+from individual import Individual
+from point import Point
+from world import World
+
+
+def make_world(**kwargs) -> World:
+    options = dict(
+        size=(10, 10),
+        initial_assets=0,
+        initial_individuals=0,
+        initial_populations=0,
+        engine="tiled",
+        seed=0,
+    )
+    options.update(kwargs)
+    return World(**options)
+
+
+def test_tiles_cover_grid():
+    world = make_world(size=(7, 5), tiles=(3, 2))
+    engine = world._engine
+    covered = np.zeros((7, 5), dtype=int)
+    for x0, x1, y0, y1 in engine.bounds:
+        covered[x0:x1, y0:y1] += 1
+    assert np.all(covered == 1)
+    x, y = map(np.ravel, np.indices((7, 5)))
+    for tile, (x0, x1, y0, y1) in enumerate(engine.bounds):
+        inside = (x0 <= x) & (x < x1) & (y0 <= y) & (y < y1)
+        assert np.all(engine.owners(x, y)[inside] == tile)
+
+
+def test_too_many_tiles_raises():
+    with pytest.raises(RuntimeError):
+        make_world(size=(3, 3), tiles=(4, 1))
+
+
+@patch("engine.INDIVIDUAL_DEATH_PROBABILITY", 0.0)
+@patch("engine.INDIVIDUAL_DAILY_STARVATION_PROBABILITY", 0.0)
+def test_agents_cross_tile_borders():
+    world = make_world()
+    individuals = Individual.get_individuals(4)
+    for individual, point in zip(individuals, [(4, 4), (4, 5), (5, 4), (5, 5)]):
+        world.individuals_positions[Point(*point)].append(individual)
+    try:
+        for _ in range(5):
+            world.move_time()
+    finally:
+        world.close()
+    assert len(world.population) == 4
+    assert all(world.is_valid_point(p) for p in world.individuals_positions)
+    assert {i.age for i in individuals} == {5}
+
+
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 1.0)
+def test_regenerated_assets_cross_tile_borders():
+    world = make_world(tiles=(2, 1))
+    world.site_positions[Point(4, 0)].add(AssetType.GROWABLE, 50)
+    try:
+        world.move_time()
+    finally:
+        world.close()
+    counts = world.site_positions.counts[:, :, ASSET_INDEX[AssetType.GROWABLE]]
+    neighbors = [(3, 0), (3, 1), (4, 1), (5, 0), (5, 1)]
+    assert [counts[p] for p in neighbors] == [ASSET_MAX_FOR_TYPE_IN_POINT] * 5
+    assert counts.sum() == 50 + 5 * ASSET_MAX_FOR_TYPE_IN_POINT
+    assert world.total_assets == counts.sum()
+
+
+def test_matches_aggregates_over_time():
+    world = make_world(
+        size=(30, 20),
+        initial_assets=1000,
+        initial_individuals=200,
+        initial_populations=6,
+        tiles=(3, 2),
+        debug=True,
+    )
+    try:
+        for _ in range(10):
+            world.move_time()
+            world.solve_conflicts(world.get_conflicts())
+    finally:
+        world.close()
+    assert world.indicators["total_population"] == len(world.population)
+
+
+def test_shared_world_matches_pickled_tiles():
+    worlds = [
+        make_world(
+            size=(30, 20),
+            initial_assets=1000,
+            initial_individuals=200,
+            initial_populations=6,
+            tiles=(3, 2),
+            debug=True,
+            shared=shared,
+        )
+        for shared in (False, True)
+    ]
+    try:
+        for _ in range(5):
+            for world in worlds:
+                world.move_time()
+    finally:
+        for world in worlds:
+            world.close()
+    pickled, shared = (world.population for world in worlds)
+    for name in ("x", "y", "age", "assets", "influence"):
+        assert np.array_equal(getattr(pickled, name), getattr(shared, name))
+    assert np.array_equal(
+        worlds[0].site_positions.counts, worlds[1].site_positions.counts
+    )
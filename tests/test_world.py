@@ -1,4 +1,5 @@
 from unittest.mock import PropertyMock, patch
+import numpy as np
 import pytest
 
 from asset import Asset, AssetType
@@ -7,7 +8,11 @@ from conflict import Conflict
 from constants import ASSET_MAX_FOR_TYPE_IN_POINT, INDIVIDUAL_MAX_AGE
 from individual import Individual
 from world import World
+from world_helper import natural_solver
 from point import Point
+from population import Population
+from rng import SimulationRNG
+from shared_state import SharedAttachments
 
 
 def test_world_initialize_assets():
@@ -144,6 +149,15 @@ def test_get_all_individuals():
     assert all_individuals[2] in individuals
 
 
+def test_positions_do_not_keep_views_alive():
+    world = World(size=(10, 10), initial_individuals=50, seed=0)
+    positions = world.individuals_positions
+    assert world.individuals_positions is positions
+    assert len(world.population._views) == 50
+    del positions
+    assert len(world.population._views) == 0
+
+
 def test_get_conflicts():
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
@@ -164,6 +178,41 @@ def test_get_conflicts():
         assert asset in conclict.assets
 
 
+def test_conflict_groups_are_built_lazily():
+    world = World(
+        size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    individuals = Individual.get_individuals(size=6)
+    world.individuals_positions[Point(4, 4)].extend(individuals[:3])
+    world.individuals_positions[Point(0, 1)].extend(individuals[3:5])
+    world.individuals_positions[Point(9, 9)].append(individuals[5])
+
+    groups = world.conflict_groups()
+    assert groups.cells.tolist() == [1, 44]
+    assert groups.offsets.tolist() == [0, 2, 5]
+    assert groups.members.tolist() == [3, 4, 0, 1, 2]
+
+    with patch.object(World, "_make_conflict", wraps=world._make_conflict) as make:
+        conflicts = world.get_conflicts()
+        assert len(conflicts) == 2
+        make.assert_not_called()
+        conflict = conflicts[-1]
+        assert conflicts[1] is conflict
+        make.assert_called_once()
+    assert conflict.place == Point(4, 4)
+    assert [id(i) for i in conflict.individuals] == [id(i) for i in individuals[:3]]
+
+
+def test_stale_conflicts_raise():
+    world = World(size=(20, 20), initial_individuals=100, seed=0)
+    conflicts = world.get_conflicts()
+    built = conflicts[0]
+    world.move_time()
+    assert conflicts[0] is built
+    with pytest.raises(RuntimeError):
+        conflicts[len(conflicts) - 1]
+
+
 def test_solve_conflicts():
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
@@ -193,15 +242,13 @@ def test_solve_conflicts():
     assert len(world.site_positions[point2]) == 10
 
 
-@patch("individual.random")
-def test_collect_assets(random_mock):
-    random_mock.return_value = 0.0
-
+def test_collect_assets():
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
     )
 
     individual = Individual.make_from_atoms()
+    individual.preferences = {at: 1.0 for at in individual.preferences}
     individual.grant_many_assets(Asset.get_assets(5))
 
     point = Point(0, 0)
@@ -215,64 +262,62 @@ def test_collect_assets(random_mock):
     assert len(individual.assets) == 15
 
 
-@patch("world.random")
-@patch.object(World, "get_random_neighboor")
-def test_regenerate_assets_success(mock_random_neighboor, random_mock):
-    point1 = Point(0, 0)
-    point2 = Point(1, 1)
+CORNER_NEIGHBORS = [Point(0, 1), Point(1, 0), Point(1, 1)]
+
 
-    mock_random_neighboor.return_value = point2
-    random_mock.return_value = 0.0
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 1.0)
+def test_regenerate_assets_success():
+    point = Point(0, 0)
 
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
     )
-    site = AssetSite()
-    site.append(Asset(AssetType.EDIBLE))
-    world.site_positions[point1] = site
+    world.site_positions[point].add(AssetType.EDIBLE, 3)
     world._regenerate_assets()
-    assert len(world.site_positions[point2]) == 1
+    assert len(world.site_positions[point]) == 3
+    assert sum(len(world.site_positions[p]) for p in CORNER_NEIGHBORS) == 3
+    assert world.total_assets == 6
 
 
-@patch("world.random")
-@patch.object(World, "get_random_neighboor")
-def test_regenerate_assets_fail(mock_random_neighboor, random_mock):
-    point1 = Point(0, 0)
-    point2 = Point(1, 1)
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 0.0)
+def test_regenerate_assets_fail():
+    world = World(
+        size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    world.site_positions[Point(0, 0)].add(AssetType.EDIBLE, 3)
+    world._regenerate_assets()
+    assert world.total_assets == 3
 
-    mock_random_neighboor.return_value = point2
-    random_mock.return_value = 1.0
 
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 1.0)
+def test_regenerate_assets_fail_because_crowded():
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
     )
-    site = AssetSite()
-    site.append(Asset(AssetType.EDIBLE))
-    world.site_positions[point1] = site
-    world._regenerate_assets()
-    assert len(world.site_positions[point2]) == 0
+    world.site_positions[Point(0, 0)].add(AssetType.EDIBLE, 5)
+    for point in CORNER_NEIGHBORS:
+        world.site_positions[point].add(AssetType.EDIBLE, ASSET_MAX_FOR_TYPE_IN_POINT)
 
+    world._regenerate_assets()
 
-@patch("world.random")
-@patch.object(World, "get_random_neighboor")
-def test_regenerate_assets_fail_because_crowded(mock_random_neighboor, random_mock):
-    point1 = Point(0, 0)
-    point2 = Point(1, 1)
+    for point in CORNER_NEIGHBORS:
+        assert len(world.site_positions[point]) == ASSET_MAX_FOR_TYPE_IN_POINT
 
-    mock_random_neighboor.return_value = point2
-    random_mock.return_value = 0.0
 
+@patch("engine.ASSET_REPRODUCTION_PROBABILITY", 1.0)
+def test_regenerate_assets_clamps_to_room():
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
     )
-    world.site_positions[point1].append(Asset(AssetType.EDIBLE))
-
-    for _ in range(ASSET_MAX_FOR_TYPE_IN_POINT):
-        world.site_positions[point2].append(Asset(AssetType.EDIBLE))
+    world.site_positions[Point(0, 0)].add(AssetType.EDIBLE, 50)
+    world.site_positions[Point(1, 1)].add(
+        AssetType.EDIBLE, ASSET_MAX_FOR_TYPE_IN_POINT - 1
+    )
 
     world._regenerate_assets()
 
-    assert len(world.site_positions[point2]) == ASSET_MAX_FOR_TYPE_IN_POINT
+    for point in CORNER_NEIGHBORS:
+        assert len(world.site_positions[point]) == ASSET_MAX_FOR_TYPE_IN_POINT
 
 
 @pytest.mark.parametrize(
@@ -282,19 +327,21 @@ def test_regenerate_assets_fail_because_crowded(mock_random_neighboor, random_mo
         (10, False),
     ],
 )
-@patch.object(Individual, "get_old")
-def test_age_individuals(get_old_mock, assets_num, survive):
-    get_old_mock.return_value = survive
+@patch("engine.INDIVIDUAL_DAILY_STARVATION_PROBABILITY", 0.0)
+def test_age_individuals(assets_num, survive):
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
     )
     individual = Individual.make_from_atoms()
-    individual.grant_many_assets(Asset.get_assets(assets_num))
+    individual.grant_many_assets(Asset.get_non_growable(assets_num))
     point = Point(0, 0)
     world.individuals_positions[point].append(individual)
 
-    world._age_individuals()
+    with patch("engine.INDIVIDUAL_DEATH_PROBABILITY", 0.0 if survive else 1.0):
+        world._age_individuals()
 
+    assert individual.age == 1
+    assert individual.starving_days == 1
     if survive:
         assert len(world.individuals_positions[point]) == 1
         assert len(world.site_positions[point]) == 0
@@ -302,13 +349,31 @@ def test_age_individuals(get_old_mock, assets_num, survive):
         assert len(world.individuals_positions[point]) == 0
         assert len(world.site_positions[point]) == assets_num
 
-    get_old_mock.assert_called_with(1)
 
+def test_age_individuals_eats_and_dies_of_old_age():
+    world = World(
+        size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    old, young = Individual.get_individuals(2)
+    old.age = INDIVIDUAL_MAX_AGE
+    for individual in (old, young):
+        individual.starving_days = 3
+        individual.grant_many_assets(Asset.get_edible(2))
+    world.individuals_positions[Point(2, 3)].append(old)
+    world.individuals_positions[Point(4, 4)].append(young)
+
+    with patch("engine.INDIVIDUAL_DEATH_PROBABILITY", 0.0):
+        world._age_individuals()
+
+    assert world.get_all_individuals() == [young]
+    assert young.starving_days == 0
+    assert young.total_of_type(AssetType.EDIBLE) == 1
+    assert world.site_positions[Point(2, 3)].counts == [1, 0, 0]
 
-@patch.object(World, "get_all_individuals")
-@patch.object(Individual, "dna_distance")
-def test_update_influences(dna_distance_mock, get_all_individuals_mock):
-    dna_distance_mock.side_effect = [10.0, 20.0, 30.0, 40.0]
+
+@patch.object(Population, "dna_distances")
+def test_update_influences(dna_distances_mock):
+    dna_distances_mock.return_value = np.array([10.0, 20.0, 30.0, 40.0])
 
     world = World(
         size=(10, 10), initial_assets=50, initial_individuals=0, initial_populations=0
@@ -316,7 +381,6 @@ def test_update_influences(dna_distance_mock, get_all_individuals_mock):
 
     point = Point(0, 0)
     individuals = Individual.get_individuals(4)
-    get_all_individuals_mock.return_value = individuals
 
     for i in range(4):
         individuals[i].age = i + 1
@@ -378,11 +442,11 @@ def test_total_assets():
     assert world.total_assets == 70
 
 
-@patch.object(World, "get_random_neighboor")
-def test_move_individuals(get_random_neighboor_mock):
+@patch.object(SimulationRNG, "uniforms")
+def test_move_individuals(uniforms_mock):
     point1 = Point(0, 0)
     point2 = Point(1, 1)
-    get_random_neighboor_mock.return_value = point2
+    uniforms_mock.return_value = np.array([0.99])
 
     world = World(
         size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
@@ -397,6 +461,22 @@ def test_move_individuals(get_random_neighboor_mock):
     assert world.individuals_positions[point2][0] == individual
 
 
+def test_move_individuals_stays_in_grid():
+    world = World(
+        size=(3, 2), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    individuals = Individual.get_individuals(6)
+    for individual, (x, y) in zip(individuals, np.ndindex(3, 2)):
+        world.individuals_positions[Point(x, y)].append(individual)
+    for _ in range(50):
+        before = list(zip(world.population.x.tolist(), world.population.y.tolist()))
+        world._move_individuals()
+        after = zip(world.population.x.tolist(), world.population.y.tolist())
+        for (x0, y0), (x1, y1) in zip(before, after):
+            assert world.is_valid_point(Point(x1, y1))
+            assert max(abs(x1 - x0), abs(y1 - y0)) == 1
+
+
 @patch.object(World, "_collect_assets")
 @patch.object(World, "_regenerate_assets")
 @patch.object(World, "_age_individuals")
@@ -420,22 +500,88 @@ def test_move_time(
     move_individuals_mock.assert_called_once()
 
 
-@patch("world.Individual.happiness", new_callable=PropertyMock)
-def test_indicators(happiness_mock):
-    avg_happiness = 5.0
-    happiness_mock.return_value = 5.0
+def test_indicators():
+    world = World(
+        size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    individuals = Individual.get_individuals(4)
+    for i, individual in enumerate(individuals):
+        individual.preferences = {at: 0.5 for at in individual.preferences}
+        individual.age = 2 * i
+        individual.grant_many_assets(Asset.get_edible(4 * i))
+    world.individuals_positions[Point(0, 0)].extend(individuals)
+
+    indicators = world.indicators
+
+    assert indicators.get("total_population") == 4
+    assert indicators.get("avg_happines") == pytest.approx(3.0)
+    assert indicators.get("avg_age") == pytest.approx(3.0)
+
+
+def test_indicators_follow_mutations():
+    world = World(
+        size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    individuals = Individual.get_individuals(2)
+    for individual in individuals:
+        individual.preferences = {at: 1.0 for at in individual.preferences}
+    world.individuals_positions[Point(0, 0)].extend(individuals)
+    individuals[0].grant_many_assets(Asset.get_edible(6))
+    individuals[1].age = 10
+    world.individuals_positions[Point(0, 0)] = individuals[:1]
+
+    indicators = world.indicators
+
+    assert indicators.get("total_population") == 1
+    assert indicators.get("avg_happines") == pytest.approx(6.0)
+    assert indicators.get("avg_age") == pytest.approx(0.0)
+
+
+def test_asset_ledger():
+    world = World(
+        size=(10, 10), initial_assets=0, initial_individuals=0, initial_populations=0
+    )
+    world.site_positions[Point(1, 1)].extend(Asset.get_growable(3))
+    individual = Individual.make_from_atoms()
+    individual.grant_many_assets(Asset.get_edible(2))
+    world.individuals_positions[Point(0, 0)].append(individual)
+    individual.revoke(AssetType.EDIBLE)
+
+    assert world.asset_ledger == {
+        "site": {"EDIBLE": 0, "GROWABLE": 3, "NON_GROWABLE": 0},
+        "inventory": {"EDIBLE": 1, "GROWABLE": 0, "NON_GROWABLE": 0},
+    }
+    assert world.total_assets == 4
+
 
+@pytest.mark.parametrize("engine", ["object", "vectorized"])
+def test_debug_aggregates_hold_over_time(engine):
     world = World(
         size=(10, 10),
-        initial_assets=0,
-        initial_individuals=9,
+        initial_assets=200,
+        initial_individuals=30,
         initial_populations=3,
+        engine=engine,
+        debug=True,
     )
+    for _ in range(10):
+        world.move_time()
+        conflicts = world.get_conflicts()
+        world.solve_conflicts(conflicts)
+    world.indicators
 
-    indicators = world.indicators
 
-    assert indicators.get("total_population") == 9
-    assert indicators.get("avg_happines") == pytest.approx(avg_happiness)
+def test_debug_detects_drift():
+    world = World(
+        size=(10, 10),
+        initial_assets=20,
+        initial_individuals=5,
+        initial_populations=1,
+        debug=True,
+    )
+    world.population._age_total += 1
+    with pytest.raises(RuntimeError):
+        world.indicators
 
 
 @patch("world.Individual.happiness", new_callable=PropertyMock)
@@ -455,3 +601,127 @@ def test_indicators_zero_population(happiness_mock):
     assert indicators.get("total_population") == 0
     assert indicators.get("avg_happines") == pytest.approx(avg_happiness)
     assert indicators.get("avg_age") == pytest.approx(0)
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized"])
+def test_same_seed_same_run(engine):
+    def run():
+        world = World(
+            size=(10, 10),
+            initial_assets=100,
+            initial_individuals=20,
+            initial_populations=3,
+            engine=engine,
+            seed=42,
+        )
+        history = []
+        for _ in range(10):
+            world.solve_conflicts(natural_solver(world.get_conflicts(), world.rng))
+            world.move_time()
+            history.append((world.indicators, world.asset_ledger))
+        return history
+
+    assert run() == run()
+
+
+def test_bulk_initialization():
+    world = World(
+        size=(50, 50),
+        initial_assets=5000,
+        initial_individuals=1000,
+        initial_populations=4,
+        seed=3,
+    )
+    population = world.population
+    assert len(population) == 1000
+    assert world.total_assets == 5000
+    assert sum(map(len, world.site_positions.values())) == 5000
+    assert np.allclose(np.sort(population.preferences, axis=1), [[0.1, 0.5, 0.9]])
+    assert len(world.individuals_positions) <= 4 * 9
+    individual = world.get_all_individuals()[0]
+    assert len(individual.dna) > 0
+    assert individual.assets == []
+
+
+def test_shared_world_exposes_segments():
+    world = World(
+        size=(10, 8),
+        initial_assets=100,
+        initial_individuals=20,
+        initial_populations=2,
+        seed=1,
+        shared=True,
+        debug=True,
+    )
+    try:
+        for _ in range(3):
+            world.move_time()
+            world.solve_conflicts(natural_solver(world.get_conflicts(), world.rng))
+        spec = world.shared_spec()
+        attachments = SharedAttachments()
+        arrays = attachments.attach_all(spec["arrays"])
+        size = spec["size"]
+        assert np.array_equal(arrays["x"][:size], world.population.x)
+        assert np.array_equal(arrays["counts"], world.site_positions.counts)
+        assert arrays["occupancy"].sum() == len(world.population)
+        assert np.array_equal(arrays["occupancy"], world.occupancy)
+        attachments.close()
+    finally:
+        world.close()
+
+
+def test_private_world_has_no_shared_spec():
+    world = World(size=(5, 5), initial_individuals=0, initial_assets=0)
+    with pytest.raises(RuntimeError):
+        world.shared_spec()
+
+
+@pytest.mark.parametrize("engine", ["object", "vectorized"])
+def test_sparse_world_matches_dense(engine):
+    def run(sparse):
+        world = World(
+            size=(12, 9),
+            initial_assets=150,
+            initial_individuals=25,
+            initial_populations=3,
+            engine=engine,
+            seed=7,
+            sparse=sparse,
+            debug=True,
+        )
+        history = []
+        for _ in range(8):
+            world.solve_conflicts(natural_solver(world.get_conflicts(), world.rng))
+            world.move_time()
+            history.append((world.indicators, world.asset_ledger))
+        return history, world.site_positions.items()
+
+    dense, sparse = run(False), run(True)
+    assert dense[0] == sparse[0]
+    assert [(p, s.counts) for p, s in dense[1]] == [(p, s.counts) for p, s in sparse[1]]
+
+
+def test_sparse_world_on_huge_grid():
+    world = World(
+        size=(100_000, 100_000),
+        initial_assets=20_000,
+        initial_individuals=2_000,
+        initial_populations=50,
+        engine="vectorized",
+        seed=0,
+        sparse=True,
+        debug=True,
+    )
+    for _ in range(3):
+        world.move_time()
+    cells, counts = world.site_positions.occupied()
+    assert counts.any(axis=1).all()
+    assert len(cells) <= world.site_positions.total
+    assert world.total_assets >= 20_000
+    with pytest.raises(RuntimeError):
+        world.occupancy
+
+
+def test_sparse_world_cannot_be_tiled():
+    with pytest.raises(RuntimeError):
+        World(size=(5, 5), engine="tiled", sparse=True)
@@ -7,6 +7,7 @@ from conflict import Conflict
 from individual import Individual
 from src.point import Point
 from world_helper import (
+    get_cells_distributed,
     get_points_distributed,
     harvest_by_influence,
     natural_solver,
@@ -98,7 +99,7 @@ def test_solve_duel():
     assert len(individual3.assets) == 3
 
 
-@patch("individual.random")
+@patch("asset_site.random")
 def test_harvest_by_influence(random_mock):
     random_mock.return_value = 0.0
     individual1, individual2, individual3 = Individual.get_individuals(3)
@@ -205,3 +206,9 @@ def test_solve_interaction_naturally_duel(random_mock):
     individuals = solve_interaction_naturally(individual1, individual2)
     assert len(individuals) == 2
     assert len(individuals[0].assets) + len(individuals[1].assets) == 10
+
+
+def test_get_cells_distributed_unique():
+    cells = get_cells_distributed(grid_size=(50, 40), num_points=2000)
+    assert len(set(cells.tolist())) == 2000
+    assert cells.min() >= 0 and cells.max() < 2000